@@ -1,4 +1,10 @@
 from .image import Image
 from .metadata import Metadata
 from .page import Page
+from .wordbackend import WordBackend
+from .layoutwords import LayoutWords
+from .charwords import CharWords
+from .pdftotextwords import PdftotextWords
 from .pdf import Pdf
+from .pagecache import PageCache
+from .pagepool import PagePool
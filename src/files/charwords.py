@@ -0,0 +1,102 @@
+from typing import Dict, List
+
+from pdfminer.converter import PDFPageAggregator, PDFResourceManager
+from pdfminer.layout import LTChar
+from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
+
+from geometry import Area, AreaList
+
+from .wordbackend import WordBackend
+
+
+class CharWords(WordBackend):
+    """Backend grouping the characters of pdfminer into text lines, without its layout analysis
+    
+    Consecutive characters are on the same line with the rules of pdfminer default layout parameters,
+    lines aren't grouped into text boxes so they stay in the order of the page content
+    """
+    NAME = 'chars'
+    LINE_OVERLAP = 0.5
+    """minimum vertical overlap (relative to the smallest character height) of characters on the same line
+    """
+    CHAR_MARGIN = 2.0
+    """maximum horizontal distance (relative to the biggest character size) of characters on the same line
+    """
+    WORD_MARGIN = 0.1
+    """minimum horizontal distance (relative to the character size) of characters separated by a space
+    """
+    
+    def fetch(self, file: str, pages: Dict[int, Area], dpi: int) -> Dict[int, AreaList]:
+        """Fetch text lines of pdf pages with their coordinates
+
+        Args:
+            file (str): pdf file path
+            pages (Dict[int, Area]): image area of each page to fetch by page number (starting from 0)
+            dpi (int): resolution of page images
+
+        Returns:
+            Dict[int, AreaList]: list of area with line content by page number
+        """
+        words = {}
+        if not len(pages):
+            return words
+        with open(file, "rb") as fp:
+            rsrcmgr = PDFResourceManager()
+            device = PDFPageAggregator(rsrcmgr=rsrcmgr, laparams=None)
+            interpreter = PDFPageInterpreter(rsrcmgr=rsrcmgr, device=device)
+            for page_number, page in zip(sorted(pages), PDFPage.get_pages(fp=fp, pagenos=pages)):
+                interpreter.process_page(page=page)
+                words[page_number] = AreaList()
+                chars = [e for e in device.get_result() if isinstance(e, LTChar)]
+                for line in self.__lines(chars):
+                    bbox = (min(c.x0 for c in line), min(c.y0 for c in line), max(c.x1 for c in line), max(c.y1 for c in line))
+                    if bbox[2] > bbox[0] and bbox[3] > bbox[1]: # empty lines are dropped by the layout analysis
+                        words[page_number].append(self._area(bbox, self.__text(line), pages[page_number], dpi))
+        return words
+    
+    def __lines(self, chars: List[LTChar]) -> List[List[LTChar]]:
+        """Group consecutive characters aligned horizontally into lines
+
+        Args:
+            chars (List[LTChar]): characters in the order of the page content
+
+        Returns:
+            List[List[LTChar]]: characters of each line
+        """
+        lines = []
+        for c in chars:
+            if len(lines) and self.__aligned(lines[-1][-1], c):
+                lines[-1].append(c)
+            else:
+                lines.append([c])
+        return lines
+    
+    def __aligned(self, c0: LTChar, c1: LTChar) -> bool:
+        """Check if two characters are on the same line
+
+        Args:
+            c0 (LTChar): first character
+            c1 (LTChar): following character
+
+        Returns:
+            bool: True if they overlap vertically and are close enough horizontally
+        """
+        return c0.is_voverlap(c1) and min(c0.height, c1.height) * self.LINE_OVERLAP < c0.voverlap(c1) and \
+                c0.hdistance(c1) < max(c0.width, c1.width) * self.CHAR_MARGIN
+    
+    def __text(self, line: List[LTChar]) -> str:
+        """Get the text of a line, with spaces between distant characters
+
+        Args:
+            line (List[LTChar]): characters of the line
+
+        Returns:
+            str: text of the line
+        """
+        text = line[0].get_text()
+        for c0, c1 in zip(line, line[1:]):
+            if c0.x1 < c1.x0 - self.WORD_MARGIN * max(c1.width, c1.height):
+                text += ' '
+            text += c1.get_text()
+        return text
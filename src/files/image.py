@@ -1,5 +1,4 @@
-import copy
-from typing import Any, Tuple, Union
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
 
 import cv2
 import numpy as np
@@ -10,26 +9,144 @@ from utils import Color
 
 class Image:
     """Class used to manipulate image (with OpenCv library)
+    
+    Planes (gray, binary, color and color masks) are computed from the source pixel buffer on first use and kept,
+    sub images are views sharing the planes of their parent, a shared plane is copied by the first image drawing on it
+    """
+    DPI = 200
+    """default resolution of images
+    """
+    __DILATE = 0.02
+    """size (in inches) of the kernel dilating images
+    """
+    __THRESHOLD = 130
+    """gray level under which a pixel is black in the binary plane
+    """
+    MASKS = [(Color.YELLOW, False)]
+    """color masks (color, on grayscale) showing the shapes drawn in color on an image drawn in gray (its source isn't drawn)
     """
-    def __init__(self, path: str = None, margin: Area = None, img: 'Image' = None) -> None:
-        """Init an image from a path or a another image
+    __SOURCE = 'source'
+    """key of the source pixel buffer (in RGB or BGR order) among planes
+    """
+    __GRAY = 'gray'
+    """key of the gray plane among planes (color masks are keyed by color and grayscale)
+    """
+    __BINARY = 'binary'
+    """key of the binary plane among planes
+    """
+    __COLOR = 'color'
+    """key of the color plane (BGR) among planes, when the source is in RGB order
+    """
+    
+    def __init__(self, path: str = None, margin: Area = None, img: np.ndarray = None, rgb: bool = False, dpi: int = DPI, color: bool = True) -> None:
+        """Init an image from a path or a pixel buffer
         
         You need to add at least one source (path or img)
 
         Args:
             path (str, optional): image path. Defaults to None.
             margin (Area, optional): image area. Defaults to None.
-            img (Image, optional): an other image when no path is defined. Defaults to None.
+            img (np.ndarray, optional): pixel buffer (used without copy, it must outlive the image) when no path is defined. Defaults to None.
+            rgb (bool, optional): whether the pixel buffer is in RGB order (as rendered by pdf2image) instead of BGR. Defaults to False.
+            dpi (int, optional): resolution of the image, used to convert physical sizes into pixels. Defaults to DPI.
+            color (bool, optional): draw and save in color (the gray plane is used otherwise). Defaults to True.
         """
         assert path is not None or img is not None, "You need to add at least one source (path or img)"
         self.path = path
-        self.color = cv2.imread(filename=path, flags=cv2.IMREAD_COLOR) if img is None else img
-        h, w, _ = self.color.shape
+        self.dpi = dpi
+        owned = set()
+        if img is None:
+            img = cv2.imread(filename=path, flags=cv2.IMREAD_COLOR)
+            rgb = False
+            owned.add(self.__SOURCE)
         if margin is not None:
-            self.color = self.color[margin.y1():margin.y2(), margin.x1():margin.x2()]
-        self.gray = cv2.cvtColor(src=self.color, code=cv2.COLOR_BGR2GRAY)
-        h, w, _ = self.color.shape
+            img = img[margin.y1():margin.y2(), margin.x1():margin.x2()]
+        self.__rgb = rgb
+        self.__color = color
+        self.__planes: Dict[Any, np.ndarray] = {self.__SOURCE: img}
+        self.__owned: Set[Any] = owned
+        h, w = img.shape[:2]
         self.area = Area(p1=Point(0,0), p2=Point(w,h))
+        self.__integrals = {}
+    
+    @property
+    def gray(self) -> np.ndarray:
+        """Gray plane
+
+        Returns:
+            np.ndarray: gray plane (computed on first use)
+        """
+        return self.__plane(self.__GRAY)
+    
+    @property
+    def binary(self) -> np.ndarray:
+        """Binary plane (black pixels are set)
+
+        Returns:
+            np.ndarray: binary plane (computed on first use)
+        """
+        return self.__plane(self.__BINARY)
+    
+    @property
+    def color(self) -> np.ndarray:
+        """Color plane (BGR)
+
+        Returns:
+            np.ndarray: color plane (computed on first use), None when the image is drawn and saved in gray
+        """
+        if not self.__color:
+            return None
+        return self.__plane(self.__COLOR if self.__rgb else self.__SOURCE)
+    
+    def __plane(self, key: Any) -> np.ndarray:
+        """Get a plane, computed from the source (or the gray plane) on first use
+
+        Args:
+            key (Any): key of the plane (or color and grayscale of a mask)
+
+        Returns:
+            np.ndarray: the plane
+        """
+        if key not in self.__planes:
+            source = self.__planes[self.__SOURCE]
+            if key == self.__GRAY:
+                plane = cv2.cvtColor(src=source, code=cv2.COLOR_RGB2GRAY if self.__rgb else cv2.COLOR_BGR2GRAY)
+            elif key == self.__BINARY:
+                plane = self.__binary(self.gray)
+            elif key == self.__COLOR:
+                plane = cv2.cvtColor(src=source, code=cv2.COLOR_RGB2BGR)
+            else:
+                mask_color, gray = key
+                plane = self.__mask(self.gray if gray else source, mask_color, self.__rgb and not gray)
+            self.__planes[key] = plane
+            self.__owned.add(key)
+        return self.__planes[key]
+    
+    def __writable(self, key: Any) -> np.ndarray:
+        """Get a plane to draw on, it's copied first when it's shared with another image (copy on write)
+
+        Args:
+            key (Any): key of the plane
+
+        Returns:
+            np.ndarray: the plane, owned by this image
+        """
+        plane = self.__plane(key)
+        if key not in self.__owned:
+            plane = self.__planes[key] = plane.copy()
+            self.__owned.add(key)
+        return plane
+    
+    def pixels(self, inches: float) -> int:
+        """Convert a physical size into a number of pixels at the resolution of the image
+
+        Args:
+            inches (float): size in inches
+
+        Returns:
+            int: size in pixels (at least one pixel)
+        """
+        return max(1, round(inches * self.dpi))
         
     def find_contours(self, dilate: bool = False, all: bool = True, width: Range = None) -> AreaList:
         """Find contours (in rectangle shape) of an image
@@ -37,15 +154,16 @@ class Image:
         Args:
             dilate (bool, optional): delate the image, used when there is image noise. Defaults to False.
             all (bool, optional): search for all contours or only the firsts hierarchically. Defaults to True.
-            width (Range, optional): search contours between the given range. Defaults to None.
+            width (Range, optional): search contours between the given range (in pixels). Defaults to None.
 
         Returns:
             AreaList: List of found area  
         """
-        _, modified_image = cv2.threshold(src=self.gray, thresh=130, maxval=255, type=cv2.THRESH_BINARY_INV)
+        modified_image = self.binary
         mode = cv2.RETR_TREE if all else cv2.RETR_EXTERNAL
         if dilate:
-            kernel = np.ones(shape=(4,4), dtype=np.uint8)
+            size = self.pixels(self.__DILATE)
+            kernel = np.ones(shape=(size,size), dtype=np.uint8)
             modified_image = cv2.dilate(src=modified_image, kernel=kernel, iterations=1)
         contours, _ = cv2.findContours(image=modified_image, mode=mode, method=cv2.CHAIN_APPROX_SIMPLE)
         coordinates = AreaList()
@@ -56,74 +174,144 @@ class Image:
                 coordinates.append(area)
         return coordinates
     
-    def percent_color(self, color: Color, gray: bool) -> int:
+    def percent_color(self, color: Color, gray: bool, area: Area = None) -> int:
         """Search a color percentage within an image area
 
         Args:
             color (Color): the color to search
             gray (bool): search on grayscale
+            area (Area, optional): area where the color is searched. Defaults to the whole image.
 
         Returns:
             int: the percentage of found color 
         """
-        total = (self.area.x2() - self.area.x1()) * (self.area.y2() - self.area.y1())
-        count = 0
-        img = self.gray if gray else self.color
-        for y in range(self.area.y1(), self.area.y2()):
-            for x in range(self.area.x1(), self.area.x2()):
-                if self.__in_range(gray, img[y][x], color):
-                    count+=1
-        return (count*100)/total
+        areas = AreaList()
+        areas.append(self.area if area is None else area)
+        return self.percent_colors(areas=areas, color=color, gray=gray)[0]
     
-    def one_dimension(self, rotate: bool = False) -> list:
-        """Transform the image to one dimention list with average color
+    def percent_colors(self, areas: AreaList, color: Color, gray: bool) -> List[float]:
+        """Search a color percentage within each given area at once
+        
+        Each area is clipped to the image, the found pixels are counted with a box sum on the integral image of the color mask
 
         Args:
-            rotate (bool, optional): Rotate image to the right (when you need to swap colomn and lines). Defaults to False.
+            areas (AreaList): areas where the color is searched
+            color (Color): the color to search
+            gray (bool): search on grayscale
 
         Returns:
-            list: one dimention image 
+            List[float]: the percentage of found color for each area
         """
-        res = []
-        if rotate:
-            rotated = cv2.rotate(src=self.gray, rotateCode=cv2.ROTATE_90_CLOCKWISE)
-        for y in rotated:
-            res.append(int(sum(y)/len(y)))
-        return res
+        if not len(areas):
+            return []
+        integral = self.__integral(color=color, gray=gray)
+        h, w = integral.shape[0] - 1, integral.shape[1] - 1
+        coordinates = np.array([(a.x1(), a.y1(), a.x2(), a.y2()) for a in areas], dtype=np.int64)
+        x1, x2 = np.clip(coordinates[:,0], 0, w), np.clip(coordinates[:,2], 0, w)
+        y1, y2 = np.clip(coordinates[:,1], 0, h), np.clip(coordinates[:,3], 0, h)
+        count = (integral[y2,x2] - integral[y1,x2] - integral[y2,x1] + integral[y1,x1]).astype(np.int64)
+        total = (x2 - x1) * (y2 - y1)
+        percents = np.divide(count * 100, total, out=np.zeros(len(areas)), where=total > 0)
+        return percents.tolist()
     
-    @classmethod
-    def __in_range(cls, gray: bool, value: Union[int,Tuple[int,int,int]], ref: Color) -> bool:
-        """Check if a color is in range of an given range
+    def __integral(self, color: Color, gray: bool) -> np.ndarray:
+        """Get the integral image of a color mask (computed once and kept until the image is modified)
 
         Args:
+            color (Color): the color of the mask
             gray (bool): use gray scale
-            value (Union[int,Tuple[int,int,int]]): color to check
-            ref (Color): reference of the color
 
         Returns:
-            bool: True if the color is in range, False otherwise
+            np.ndarray: integral image, with one more row and column than the image
+        """
+        key = (color, gray)
+        if key not in self.__integrals:
+            self.__integrals[key] = cv2.integral(src=self.__plane(key) // 255, sdepth=cv2.CV_32S)
+        return self.__integrals[key]
+    
+    @classmethod
+    def __binary(cls, gray: np.ndarray) -> np.ndarray:
+        """Get the binary plane of a gray plane (black pixels are set)
+
+        Args:
+            gray (np.ndarray): gray plane
+
+        Returns:
+            np.ndarray: binary plane (0 or 255)
+        """
+        _, binary = cv2.threshold(src=gray, thresh=cls.__THRESHOLD, maxval=255, type=cv2.THRESH_BINARY_INV)
+        return binary
+    
+    @staticmethod
+    def __mask(img: np.ndarray, color: Color, rgb: bool = False) -> np.ndarray:
+        """Get the mask of pixels of the given color
+
+        Args:
+            img (np.ndarray): color (BGR) or gray plane
+            color (Color): the color of the mask
+            rgb (bool, optional): whether the color plane is in RGB order. Defaults to False.
+
+        Returns:
+            np.ndarray: mask (0 or 255)
+        """
+        lower, upper = np.array(color.value[0]), np.array(color.value[1])
+        if rgb:
+            lower, upper = lower[::-1], upper[::-1]
+        return cv2.inRange(src=img, lowerb=lower, upperb=upper)
+    
+    def one_dimension(self, rotate: bool = False) -> np.ndarray:
+        """Transform the image to one dimention array with average gray level
+
+        Args:
+            rotate (bool, optional): average each column instead of each line (as the lines of the image rotated to the right). Defaults to False.
+
+        Returns:
+            np.ndarray: one dimention image (integer average of each line or column)
         """
-        if gray: # Gray 1 value
-            return ref.value[0] <= value and value <= ref.value[1]
-        else: # BGR 3 values
-            return (ref.value[0][0] <= value[0] and value[0] <= ref.value[1][0] and
-                    ref.value[0][1] <= value[1] and value[1] <= ref.value[1][1] and
-                    ref.value[0][2] <= value[2] and value[2] <= ref.value[1][2])
+        axis = 0 if rotate else 1
+        return self.gray.sum(axis=axis, dtype=np.int64) // self.gray.shape[axis]
     
-    def sub(self, area: Area = Area(Point(0,0),Point(0,0)), copy_img: bool = True) -> 'Image':
+    def sub(self, area: Area = Area(Point(0,0),Point(0,0)), copy_img: bool = False) -> 'Image':
         """Create a sub image from this one
+        
+        The sub image is a view on the planes of this one (the source and the planes already computed),
+        a plane is copied only when one of the images draws on it
 
         Args:
             area (Area, optional): the area where image is taken from. Defaults to Area(Point(0,0),Point(0,0)).
-            copy_img (bool, optional): Whether created image should be a copy of the original . Defaults to True.
+            copy_img (bool, optional): Whether created image should copy its planes right away instead of sharing them. Defaults to False.
 
         Returns:
             Image: sub image created
         """
-        if copy_img:
-            return Image(margin=area, img=copy.deepcopy(self.color))
-        else:
-            return Image(margin=area, img=self.color)
+        image = Image.__new__(Image)
+        image.path = self.path
+        image.dpi = self.dpi
+        image.__rgb = self.__rgb
+        image.__color = self.__color
+        image.__planes = {key: self.__crop(plane, area, copy_img) for key, plane in self.__planes.items()}
+        image.__owned = set(image.__planes) if copy_img else set()
+        if not copy_img:
+            self.__owned.clear()
+        h, w = image.__planes[self.__SOURCE].shape[:2]
+        image.area = Area(p1=Point(0,0), p2=Point(w,h))
+        image.__integrals = {}
+        return image
+    
+    @staticmethod
+    def __crop(plane: np.ndarray, area: Area, copy_img: bool) -> np.ndarray:
+        """Get the part of a plane within an area
+
+        Args:
+            plane (np.ndarray): image plane
+            area (Area): the area where the plane is taken from
+            copy_img (bool): whether it should be a copy instead of a view on the plane
+
+        Returns:
+            np.ndarray: cropped plane
+        """
+        cropped = plane[area.y1():area.y2(), area.x1():area.x2()]
+        return cropped.copy() if copy_img else cropped
 
     def show(self, title: str = "", color: bool = True) -> None:
         """Show the image in another windows
@@ -132,7 +320,7 @@ class Image:
             title (str, optional): title of the windows. Defaults to "".
             color (bool, optional): Whether it should show the colored or the gray image. Defaults to True.
         """
-        cv2.imshow(winname=title ,mat=self.color if color else self.gray)
+        cv2.imshow(winname=title ,mat=self.color if color and self.color is not None else self.gray)
         cv2.waitKey(delay=0)
         cv2.destroyAllWindows()
     
@@ -144,10 +332,7 @@ class Image:
             color (Union[int,Tuple[int, int, int]], optional): color of the stroke. Defaults to (0,0,255).
             size (int, optional): size of the stroke (-1 is filled area). Defaults to 2.
         """
-        if isinstance(color, int):
-            cv2.rectangle(img=self.gray, pt1=area.p1.tuple(), pt2=area.p2.tuple(), color=color, thickness=size)
-        else:
-            cv2.rectangle(img=self.color, pt1=area.p1.tuple(), pt2=area.p2.tuple(), color=color, thickness=size)
+        self.__draw(lambda img, c: cv2.rectangle(img=img, pt1=area.p1.tuple(), pt2=area.p2.tuple(), color=c, thickness=size), color)
                 
     def line(self, p1: Point, p2: Point, color:Union[int,Tuple[int, int, int]]=(0,0,255), size:int=2):
         """Draw a line on the image with a given color
@@ -158,10 +343,36 @@ class Image:
             color (Union[int,Tuple[int, int, int]], optional): color of the stroke. Defaults to (0,0,255).
             size (int, optional): size of the stroke. Defaults to 2.
         """
-        if isinstance(color, int):
-            cv2.line(img=self.gray, pt1=p1.tuple(), pt2=p2.tuple(), color=color, thickness=size)
+        self.__draw(lambda img, c: cv2.line(img=img, pt1=p1.tuple(), pt2=p2.tuple(), color=c, thickness=size), color)
+    
+    def __draw(self, draw: Callable[[np.ndarray, Any], None], color: Union[int,Tuple[int, int, int]]) -> None:
+        """Draw a shape on the gray plane (gray level) or on the source (color), and on the planes already computed from it
+        
+        Planes not computed yet will be computed from the drawn plane, the gray plane is computed before drawing in color so it never shows color shapes.
+        An image drawn in gray doesn't copy its source to draw in color, the shape only shows on the color masks of MASKS
+
+        Args:
+            draw (Callable[[np.ndarray, Any], None]): function drawing the shape on a plane with a color
+            color (Union[int,Tuple[int, int, int]]): gray level or color (BGR) of the shape
+        """
+        self.__integrals.clear()
+        gray = isinstance(color, int)
+        pixel = np.full(shape=(1,1) if gray else (1,1,3), fill_value=color, dtype=np.uint8)
+        if gray:
+            draw(self.__writable(self.__GRAY), color)
+            if self.__BINARY in self.__planes:
+                draw(self.__writable(self.__BINARY), int(self.__binary(pixel)[0,0]))
         else:
-            cv2.line(img=self.color, pt1=p1.tuple(), pt2=p2.tuple(), color=color, thickness=size)
+            self.__plane(self.__GRAY)
+            if self.__color:
+                draw(self.__writable(self.__SOURCE), tuple(reversed(color)) if self.__rgb else color)
+                if self.__COLOR in self.__planes:
+                    draw(self.__writable(self.__COLOR), color)
+            else:
+                for key in self.MASKS:
+                    self.__plane(key)
+        for key in [k for k in self.__planes if isinstance(k, tuple) and k[1] == gray]:
+            draw(self.__writable(key), int(self.__mask(pixel, key[0])[0,0]))
     
     def save(self, path: str, name: str, color: bool = True) -> None:
         """Save the image on a given file
@@ -171,4 +382,4 @@ class Image:
             name (str): name of the file (without extension)
             color (bool, optional): whether it should be the colored one or the gray. Defaults to True.
         """
-        cv2.imwrite(f"{path}/{name}.jpg", self.color if color else self.gray)
+        cv2.imwrite(f"{path}/{name}.jpg", self.color if color and self.color is not None else self.gray)
@@ -0,0 +1,43 @@
+from typing import Dict
+
+from pdfminer.converter import PDFPageAggregator, PDFResourceManager
+from pdfminer.layout import LAParams, LTTextBoxHorizontal
+from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
+
+from geometry import Area, AreaList
+
+from .wordbackend import WordBackend
+
+
+class LayoutWords(WordBackend):
+    """Backend fetching text lines with the full layout analysis of pdfminer
+    """
+    NAME = 'layout'
+    
+    def fetch(self, file: str, pages: Dict[int, Area], dpi: int) -> Dict[int, AreaList]:
+        """Fetch text lines of pdf pages with their coordinates (lines of horizontal text boxes)
+
+        Args:
+            file (str): pdf file path
+            pages (Dict[int, Area]): image area of each page to fetch by page number (starting from 0)
+            dpi (int): resolution of page images
+
+        Returns:
+            Dict[int, AreaList]: list of area with line content by page number
+        """
+        words = {}
+        if not len(pages):
+            return words
+        with open(file, "rb") as fp:
+            rsrcmgr = PDFResourceManager()
+            device = PDFPageAggregator(rsrcmgr=rsrcmgr, laparams=LAParams())
+            interpreter = PDFPageInterpreter(rsrcmgr=rsrcmgr, device=device)
+            for page_number, page in zip(sorted(pages), PDFPage.get_pages(fp=fp, pagenos=pages)):
+                interpreter.process_page(page=page)
+                words[page_number] = AreaList()
+                for element in device.get_result():
+                    if isinstance(element, LTTextBoxHorizontal):
+                        for text_line in element._objs:
+                            words[page_number].append(self._area(text_line.bbox, text_line.get_text(), pages[page_number], dpi))
+        return words
@@ -1,6 +1,10 @@
 import datetime
+import hashlib
+import json
 import os
+import threading
 import time
+from typing import Dict, List
 from urllib.parse import urlparse
 
 import requests
@@ -12,6 +16,24 @@ class Metadata:
     __TIMESTR = '%a, %d %b %Y %X GMT'
     """Time format 
     """
+    __SESSION = requests.Session()
+    """Session shared by every request (keep connections alive between checks)
+    """
+    __VALIDATORS = ('etag', 'last-modified')
+    """Headers used to know if a remote file changed
+    """
+    VALIDATORS_NAME = 'validators.json'
+    """Name of the file storing validators of the last download (next to the downloaded file)
+    """
+    PARSED_NAME = 'parsed.json'
+    """Name of the file storing the digest of the last parsed file and the files generated from it
+    """
+    SENT_NAME = 'sent.json'
+    """Name of the file storing the digest of the files last sent to each ftp server
+    """
+    __SENT_LOCK = threading.Lock()
+    """Lock of sent files (updated by upload threads)
+    """
     
     @staticmethod
     def is_local(url: str) -> bool:
@@ -30,35 +52,171 @@ class Metadata:
 
     @staticmethod
     def check_update(source: str, destination: str) -> bool:
-        """Check if the source is older than the destination (and exists)
+        """Check if the source is newer than the destination (or if destination doesn't exist)
+        
+        A remote source is downloaded into the destination when it changed
 
         Args:
             source (str): reference file path
             destination (str): file path to check
 
         Returns:
-            bool: True if the file exists and is local, False otherwise
+            bool: True if the destination need an update, False otherwise
         """
-        if not os.path.exists(path=destination):
-            return True
-        elif Metadata.is_local(url=source):
-            return Metadata.time_local(path=source) > Metadata.time_local(path=destination)        
+        if Metadata.is_local(url=source):
+            return not os.path.exists(path=destination) or Metadata.time_local(path=source) > Metadata.time_local(path=destination)
         else:
-            return Metadata.time_remote(url=source) > Metadata.time_local(path=destination) 
+            return Metadata.fetch_remote(url=source, destination=destination)
 
     @staticmethod
-    def time_remote(url: str) -> datetime:
-        """Get the last modification datetime of a remote file
+    def fetch_remote(url: str, destination: str) -> bool:
+        """Download a remote file only when it changed since the last download
+        
+        Validators (ETag and Last-Modified) of the last download are sent as conditional headers, 
+        the file is only downloaded when the server answers with a new version
 
         Args:
             url (str): file url
+            destination (str): file path where the file is downloaded
 
         Returns:
-            datetime: timestamp of last modification
+            bool: True if the file was downloaded, False if it didn't change
+        """
+        validators = Metadata.__load_validators(url=url, destination=destination)
+        headers = {}
+        if os.path.exists(path=destination):
+            if 'etag' in validators:
+                headers['If-None-Match'] = validators['etag']
+            if 'last-modified' in validators:
+                headers['If-Modified-Since'] = validators['last-modified']
+        with Metadata.__SESSION.get(url=url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 304:
+                return False
+            response.raise_for_status()
+            remote = {v: response.headers[v] for v in Metadata.__VALIDATORS if v in response.headers}
+            if len(headers) and len(remote) and remote == validators: # server ignoring conditional headers
+                return False
+            part = f'{destination}.part'
+            with open(part, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=64*1024):
+                    file.write(chunk)
+            os.replace(src=part, dst=destination)
+        Metadata.__save_validators(url=url, destination=destination, validators=remote)
+        return True
+    
+    @staticmethod
+    def __load_validators(url: str, destination: str) -> dict:
+        """Load the validators stored for a downloaded file
+
+        Args:
+            url (str): file url
+            destination (str): downloaded file path
+
+        Returns:
+            dict: validators by header name (empty when unknown or stored for another url)
+        """
+        path = f'{os.path.dirname(destination)}/{Metadata.VALIDATORS_NAME}'
+        if not os.path.exists(path=path):
+            return {}
+        with open(path) as file:
+            stored = json.load(file)
+        if stored.get('url') != url:
+            return {}
+        return {v: stored[v] for v in Metadata.__VALIDATORS if v in stored}
+    
+    @staticmethod
+    def __save_validators(url: str, destination: str, validators: dict) -> None:
+        """Store the validators of a downloaded file
+
+        Args:
+            url (str): file url
+            destination (str): downloaded file path
+            validators (dict): validators by header name
+        """
+        path = f'{os.path.dirname(destination)}/{Metadata.VALIDATORS_NAME}'
+        with open(path, 'w') as file:
+            json.dump({'url': url, **validators}, file)
+    
+    @staticmethod
+    def digest(path: str) -> str:
+        """Get the digest (sha256) of a file content
+
+        Args:
+            path (str): file path
+
+        Returns:
+            str: hexadecimal digest
+        """
+        sha = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(64*1024), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+    
+    @staticmethod
+    def load_parsed(directory: str) -> dict:
+        """Load the digest of the last parsed file and the files generated from it
+
+        Args:
+            directory (str): directory where it is stored
+
+        Returns:
+            dict: 'digest' and 'files' of the last parsing (empty if unknown)
+        """
+        path = f'{directory}/{Metadata.PARSED_NAME}'
+        if not os.path.exists(path=path):
+            return {}
+        with open(path) as file:
+            return json.load(file)
+    
+    @staticmethod
+    def save_parsed(directory: str, digest: str, files: List[str]) -> None:
+        """Store the digest of a parsed file and the files generated from it
+
+        Args:
+            directory (str): directory where it is stored
+            digest (str): digest of the parsed file
+            files (List[str]): files generated from the parsed file
+        """
+        with open(f'{directory}/{Metadata.PARSED_NAME}', 'w') as file:
+            json.dump({'digest': digest, 'files': files}, file)
+    
+    @staticmethod
+    def load_sent(directory: str, server: str) -> Dict[str, str]:
+        """Load the digest of the files last sent to a server
+
+        Args:
+            directory (str): directory where it is stored
+            server (str): key of the server (see FtpHandler.key)
+
+        Returns:
+            Dict[str, str]: digest of the content last sent by file name
+        """
+        path = f'{directory}/{Metadata.SENT_NAME}'
+        with Metadata.__SENT_LOCK:
+            if not os.path.exists(path=path):
+                return {}
+            with open(path) as file:
+                return json.load(file).get(server, {})
+    
+    @staticmethod
+    def save_sent(directory: str, server: str, sent: Dict[str, str]) -> None:
+        """Store the digest of files sent to a server (other files keep their digest)
+
+        Args:
+            directory (str): directory where it is stored
+            server (str): key of the server (see FtpHandler.key)
+            sent (Dict[str, str]): digest of the content sent by file name
         """
-        request = requests.get(url=url, timeout=60)
-        header = request.headers['last-modified']
-        return datetime.datetime.strptime(header,Metadata.__TIMESTR)
+        path = f'{directory}/{Metadata.SENT_NAME}'
+        with Metadata.__SENT_LOCK:
+            stored = {}
+            if os.path.exists(path=path):
+                with open(path) as file:
+                    stored = json.load(file)
+            stored[server] = {**stored.get(server, {}), **sent}
+            with open(path, 'w') as file:
+                json.dump(stored, file)
     
     @staticmethod
     def time_local(path: str) -> datetime:
@@ -9,23 +9,29 @@ from schedule import Time, Week
 class Page:
     """Class parsing each page of a pdf into single weeks
     """
-    __RANGE_WEEK = Range(1900, 2200, AxeType.ABSCISSA)
-    """Range (width) of a week
+    __RANGE_WEEK = Range(9.5, 11, AxeType.ABSCISSA)
+    """Range (width in inches) of a week
+    """
+    __BORDER = 0.025
+    """Size (in inches) of the border drawn around each week
     """
     
-    def __init__(self, image: Image , words: AreaList, id: int) -> None:
+    def __init__(self, image: Image , words: AreaList, id: int, week_coordinate: AreaList = None) -> None:
         """Constructor of Page
         Get the week contours and detected week date
         Args:
             image (Image): image of the page
             words (AreaList): list of words with its area
             id (int): id of the page
+            week_coordinate (AreaList, optional): week contours when already known (from cache). Defaults to None.
         """
         self.image = image
         self.id = id
         self.words = words
         self.dates = self.__gen_week_dates()
-        self.week_coordinate = self.image.find_contours(dilate=False, all=False, width=self.__RANGE_WEEK)
+        if week_coordinate is None:
+            week_coordinate = self.image.find_contours(dilate=False, all=False, width=self.__RANGE_WEEK.scale(self.image.dpi))
+        self.week_coordinate = week_coordinate
 
     def __gen_week_dates(self) -> AreaList:
         """Get the list of dates present on the page (with its area)
@@ -45,17 +51,17 @@ class Page:
             List[Week]: list of weeks on the page
         """
         weeks = []
+        dates_index = self.dates.index()
+        words_index = self.words.index()
         for c in self.week_coordinate:
             r: Range = c.to_range(axe=AxeType.ORDINATE)
-            times = []
-            for t in self.dates:
-                if r.is_between(area=t):
-                    times.append(t.content)
+            times = [self.dates[i].content for i in dates_index.between(r)]
             image = self.image.sub(area=c)
             # make sure there is contour around the week
-            image.frame(area=image.area, color=(0,0,0), size=5)
-            image.frame(area=image.area, color=0, size=5)
-            week_word = self.words.contained(area=c)
+            border = self.image.pixels(self.__BORDER)
+            image.frame(area=image.area, color=(0,0,0), size=border)
+            image.frame(area=image.area, color=0, size=border)
+            week_word = self.words.contained(area=c, index=words_index).copy()
             week_word.change_origin(point=c.p1)
             week = Week(image=image, words=week_word, times=times, weeks=weeks)
             if hasattr(week,'days'): #if there is no days, this is not a week
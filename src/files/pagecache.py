@@ -0,0 +1,149 @@
+import hashlib
+import hmac
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+
+class PageCache:
+    """Content addressed cache storing parsed pages artifacts in a directory
+    
+    Entries are written atomically so the directory can be shared between several instances (with the same key), 
+    the least recently used entries are evicted when the directory exceeds its maximum size.
+    Each entry is signed (HMAC-SHA256) and is only unpickled when its signature matches, so only the holders of the key can store entries
+    """
+    EXTENSION = '.pickle'
+    """Extension of cache entries
+    """
+    VERSION = 3
+    """Format of cache entries, to increase when stored classes change (entries of other formats are never read and end up evicted)
+    """
+    RESCAN = 0.1
+    """Part of the maximum size written by this instance after which the directory is listed again (to count the entries of the other instances)
+    """
+    
+    def __init__(self, directory: str, max_size: int, key: bytes) -> None:
+        """Constructor of PageCache, the size of the stored entries is read from the directory then tracked in memory until it's listed again
+
+        Args:
+            directory (str): directory where entries are stored
+            max_size (int): maximum size of the directory in bytes
+            key (bytes): secret key signing entries (shared by the instances sharing the directory)
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.__key = key
+        self.__lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.__entries: Dict[str, Tuple[float, int]] = self.__scan()
+        self.__written = 0
+    
+    def get(self, key: str) -> Any:
+        """Get an entry from the cache
+
+        Args:
+            key (str): entry key
+
+        Returns:
+            Any: stored entry, None if there is no valid entry for this key
+        """
+        path = self.__path(key)
+        try:
+            with open(path, 'rb') as file:
+                signature, data = file.read(hashlib.sha256().digest_size), file.read()
+            if not hmac.compare_digest(signature, self.__sign(path, data)):
+                return None
+            entry = pickle.loads(data)
+            os.utime(path) # mark as recently used
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        with self.__lock:
+            self.__entries[os.path.basename(path)] = (time.time(), len(signature) + len(data))
+        return entry
+    
+    def put(self, key: str, entry: Any) -> None:
+        """Store an entry in the cache then evict old entries if needed
+
+        Args:
+            key (str): entry key
+            entry (Any): entry to store (must be picklable)
+        """
+        path = self.__path(key)
+        data = pickle.dumps(entry)
+        signature = self.__sign(path, data)
+        temp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp, 'wb') as file:
+            file.write(signature)
+            file.write(data)
+        os.replace(src=temp, dst=path)
+        with self.__lock:
+            self.__entries[os.path.basename(path)] = (time.time(), len(signature) + len(data))
+            self.__written += len(signature) + len(data)
+        self.__evict()
+    
+    def __evict(self) -> None:
+        """Remove least recently used entries until the directory fits in its maximum size
+        
+        The directory is listed again (entries and last uses of the other instances) when the known entries exceed the maximum size
+        or when this instance wrote a part (RESCAN) of the maximum size since the last listing
+        """
+        with self.__lock:
+            size = sum(e[1] for e in self.__entries.values())
+            if size > self.max_size or self.__written >= self.max_size * self.RESCAN:
+                self.__entries = self.__scan()
+                self.__written = 0
+                size = sum(e[1] for e in self.__entries.values())
+            evicted = []
+            for name, (_, entry_size) in sorted(self.__entries.items(), key=lambda e: e[1][0]):
+                if size <= self.max_size:
+                    break
+                evicted.append(name)
+                size -= entry_size
+            for name in evicted:
+                del self.__entries[name]
+        for name in evicted:
+            try:
+                os.remove(f'{self.directory}/{name}')
+            except FileNotFoundError: # removed by another instance
+                pass
+    
+    def __scan(self) -> Dict[str, Tuple[float, int]]:
+        """Read the last use and the size of the stored entries
+
+        Returns:
+            Dict[str, Tuple[float, int]]: last use and size in bytes by entry file name
+        """
+        entries = {}
+        for name in os.listdir(self.directory):
+            if name.endswith(self.EXTENSION):
+                try:
+                    stat = os.stat(f'{self.directory}/{name}')
+                    entries[name] = (stat.st_mtime, stat.st_size)
+                except FileNotFoundError: # removed by another instance
+                    pass
+        return entries
+    
+    def __sign(self, path: str, data: bytes) -> bytes:
+        """Get the signature of an entry (bound to its file name, so an entry can't be moved to another key)
+
+        Args:
+            path (str): file path of the entry
+            data (bytes): pickled entry
+
+        Returns:
+            bytes: HMAC-SHA256 of the entry
+        """
+        return hmac.new(self.__key, os.path.basename(path).encode() + b'\0' + data, hashlib.sha256).digest()
+    
+    def __path(self, key: str) -> str:
+        """Get the file path of an entry
+
+        Args:
+            key (str): entry key
+
+        Returns:
+            str: file path
+        """
+        return f'{self.directory}/{key}-v{self.VERSION}{self.EXTENSION}'
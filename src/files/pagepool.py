@@ -0,0 +1,198 @@
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Deque, Dict, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+from PIL.Image import Image as PILImage
+
+from files import Image, Page, Pdf
+from geometry import AreaArray, AreaList
+from schedule import Week
+from utils import Metrics
+
+
+def _warm_up() -> None:
+    """Initializer of each worker process
+
+    Heavy modules (OpenCV, pdfminer) are already imported with this module, OpenCV is limited to one thread as parallelism comes from the processes
+    """
+    cv2.setNumThreads(1)
+
+def _parse_page(file: str, page_number: int, buffer: Tuple[str, tuple, str], dpi: int, detect_folder: str, backend: str, words: AreaArray, contours: AreaList) -> Tuple[AreaArray, AreaList, List[Week], Dict[str, dict]]:
+    """Parse a pdf page into weeks (within a worker process, or in this process when the pool is broken)
+    
+    Exam colors of the weeks are measured here, their images are released unless detect mode is enabled, so no pixels are sent back
+
+    Args:
+        file (str): pdf file path
+        page_number (int): number of the page (starting from 0)
+        buffer (Tuple[str, tuple, str]): shared memory name, shape and type of the rendered page (RGB)
+        dpi (int): resolution of the rendered page
+        detect_folder (str): folder where detected elements are saved, None when detect mode is disabled
+        backend (str): name of the backend fetching words
+        words (AreaArray): words of the page when already known, None to fetch them
+        contours (AreaList): week contours of the page when already known, None to detect them
+
+    Returns:
+        Tuple[AreaArray, AreaList, List[Week], Dict[str, dict]]: words, week contours and weeks (without images) of the page, with metrics of the stages (see Metrics)
+    """
+    metrics = Metrics(level=str(page_number))
+    name, shape, dtype = buffer
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        with metrics.stage('pages') as stage:
+            pixels = np.ndarray(shape=shape, dtype=dtype, buffer=memory.buf).copy() # planes are computed lazily from it, after the shared memory is closed
+            image = Image(img=pixels, rgb=True, dpi=dpi, color=detect_folder is not None)
+            stage['items'] = 1
+    finally:
+        memory.close()
+    if words is None:
+        with metrics.stage('words'):
+            words = Pdf.fetch_page_words(file=file, page_number=page_number, area=image.area, words=backend, dpi=dpi).array()
+    with metrics.stage('pages'):
+        page = Page(image=image, words=words.to_list(), id=page_number, week_coordinate=contours)
+    with metrics.stage('weeks') as stage:
+        weeks = page.gen_weeks()
+        stage['items'] = len(weeks)
+    if detect_folder is not None:
+        page.frame_elements()
+        page.save(detect_folder)
+    else:
+        with metrics.stage('weeks'):
+            for week in weeks:
+                week.release_image()
+    return words, page.week_coordinate, weeks, metrics.stages
+
+
+class PagePool:
+    """Pool of worker processes parsing the pages of a pdf in parallel
+    
+    Workers are kept alive between pdfs, rendered pages are given to them through shared memory.
+    Workers are started by a fork server, as this process runs threads (levels, rendering, uploads) whose locks a forked child could inherit while held.
+    When a worker dies, the pool is started again and the pages it had are parsed in this process
+    """
+    
+    def __init__(self, workers: int) -> None:
+        """Constructor of PagePool, start the worker processes
+
+        Args:
+            workers (int): number of worker processes
+        """
+        self.workers = workers
+        self.__lock = threading.Lock()
+        self.context = multiprocessing.get_context('forkserver')
+        self.context.set_forkserver_preload([__name__]) # workers are forked with heavy modules already imported
+        self.executor = self.__start()
+    
+    def __start(self) -> ProcessPoolExecutor:
+        """Start a pool of worker processes
+
+        Returns:
+            ProcessPoolExecutor: the pool
+        """
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.context, initializer=_warm_up)
+    
+    def gen_weeks(self, pdf: Pdf, rendered: Iterator[Tuple[int, PILImage]], detect_folder: str = None, words: Dict[int, AreaArray] = None, contours: Dict[int, AreaList] = None, metrics: Metrics = None) -> Iterator[Tuple[int, Tuple[AreaArray, AreaList, List[Week]]]]:
+        """Generate the weeks of pages as they are rendered
+        
+        At most one page more than the number of workers is waiting in shared memory, the shared memory of a page is released once its weeks are generated
+
+        Args:
+            pdf (Pdf): pdf of the pages
+            rendered (Iterator[Tuple[int, PILImage]]): page number and image of the rendered pages (see Pdf.iter_render)
+            detect_folder (str, optional): folder where detected elements are saved. Defaults to None.
+            words (Dict[int, AreaArray], optional): words already known by page number. Defaults to None.
+            contours (Dict[int, AreaList], optional): week contours already known by page number. Defaults to None.
+            metrics (Metrics, optional): metrics receiving the stages measured by the workers (times are summed over pages). Defaults to None.
+
+        Yields:
+            Tuple[int, Tuple[AreaArray, AreaList, List[Week]]]: page number with its words, week contours and weeks (in the order of rendered pages)
+        """
+        words = {} if words is None else words
+        contours = {} if contours is None else contours
+        metrics = Metrics(level='') if metrics is None else metrics
+        submitted: Deque[Tuple[int, Future, ProcessPoolExecutor, tuple, shared_memory.SharedMemory]] = deque()
+        try:
+            for page_number, image in rendered:
+                pixels = np.asarray(image)
+                del image
+                memory = shared_memory.SharedMemory(create=True, size=pixels.nbytes)
+                np.ndarray(shape=pixels.shape, dtype=pixels.dtype, buffer=memory.buf)[:] = pixels
+                buffer = (memory.name, pixels.shape, pixels.dtype.str)
+                del pixels
+                args = (pdf.file, page_number, buffer, pdf.dpi, detect_folder, pdf.backend.NAME, words.get(page_number), contours.get(page_number))
+                submitted.append((page_number, *self.__submit(args), memory))
+                if len(submitted) > self.workers:
+                    yield self.__result(submitted.popleft(), metrics)
+            while len(submitted):
+                yield self.__result(submitted.popleft(), metrics)
+        finally:
+            for _, future, _, _, memory in submitted:
+                future.cancel()
+                if not future.cancelled():
+                    wait([future])
+                memory.close()
+                memory.unlink()
+    
+    def __submit(self, args: tuple) -> Tuple[Future, ProcessPoolExecutor, tuple]:
+        """Give a page to the workers, the pool is started again when it's broken
+
+        Args:
+            args (tuple): arguments of _parse_page
+
+        Returns:
+            Tuple[Future, ProcessPoolExecutor, tuple]: result of the worker, pool running it and arguments of _parse_page
+        """
+        executor = self.executor
+        try:
+            return executor.submit(_parse_page, *args), executor, args
+        except BrokenProcessPool:
+            self.__restart(executor)
+            return self.executor.submit(_parse_page, *args), self.executor, args
+    
+    def __restart(self, executor: ProcessPoolExecutor) -> None:
+        """Start the pool again once it's broken (a worker died)
+
+        Args:
+            executor (ProcessPoolExecutor): the broken pool, nothing is done when it was already replaced
+        """
+        with self.__lock: # the pool is shared by the levels processed at the same time
+            if executor is not self.executor:
+                return
+            print("Page pool : A worker died, starting the workers again")
+            executor.shutdown(wait=False)
+            self.executor = self.__start()
+    
+    def __result(self, job: Tuple[int, Future, ProcessPoolExecutor, tuple, shared_memory.SharedMemory], metrics: Metrics) -> Tuple[int, Tuple[AreaArray, AreaList, List[Week]]]:
+        """Wait for the weeks of a page then release its shared memory, the page is parsed in this process when the pool broke
+
+        Args:
+            job (Tuple[int, Future, ProcessPoolExecutor, tuple, shared_memory.SharedMemory]): page number, result of the worker, pool running it, arguments of _parse_page and shared memory of the page
+            metrics (Metrics): metrics receiving the stages measured by the worker
+
+        Returns:
+            Tuple[int, Tuple[AreaArray, AreaList, List[Week]]]: page number with its words, week contours and weeks
+        """
+        page_number, future, executor, args, memory = job
+        try:
+            try:
+                page_words, page_contours, weeks, stages = future.result()
+            except BrokenProcessPool:
+                self.__restart(executor)
+                page_words, page_contours, weeks, stages = _parse_page(*args)
+        finally:
+            memory.close()
+            memory.unlink()
+        for stage, record in stages.items():
+            metrics.add(stage, record['wall'], record['cpu'], record['peak_rss'], record['items'])
+        return page_number, (page_words, page_contours, weeks)
+    
+    def close(self) -> None:
+        """Stop the worker processes
+        """
+        self.executor.shutdown()
@@ -1,15 +1,21 @@
+import hashlib
+import math
 import os
+import re
 import shutil
-from typing import List
-from urllib import request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Tuple
 
+import numpy as np
 import pdf2image
-from pdfminer.converter import PDFPageAggregator, PDFResourceManager
-from pdfminer.layout import LAParams, LTTextBoxHorizontal
-from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfminer.pdfdocument import PDFDocument
 from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import PDFStream, resolve1
+from PIL.Image import Image as PILImage
 
-from files import Image, Metadata, Page
+from files import Image, LayoutWords, Metadata, Page, WordBackend
 from geometry import Area, AreaList, Point
 
 
@@ -22,90 +28,245 @@ class Pdf:
     PAGE_NAME = 'page'
     """generic name of page images
     """
+    DPI = Image.DPI
+    """default resolution of page images
+    """
+    __REGEX_DATE = re.compile(r"D:(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?([Zz+-])?(\d{2})?'?(\d{2})?")
+    """Regex of pdf dates (D:YYYYMMDDHHmmSSOHH'mm')
+    """
     
-    def __init__(self, url: str, temp_dir: str) -> None:
+    def __init__(self, url: str, temp_dir: str, words: str = LayoutWords.NAME, dpi: int = DPI) -> None:
         """Constructor of Pdf
-        Download and convert it into jpeg pages 
+        Download it, pages are converted into images with iter_render()
 
         Args:
             url (str): url of pdf to be downloaded (or copied if it's a local file)
             temp_dir (str): working directory
+            words (str, optional): name of the backend fetching words (see WordBackend). Defaults to LayoutWords.NAME.
+            dpi (int, optional): resolution of page images. Defaults to DPI.
         """
+        self.dpi = dpi
+        self.backend: WordBackend = WordBackend.get(words)
         self.temp_dir: str = temp_dir
         self.file: str = f'{temp_dir}/{self.PDF_NAME}'
         self.__fetch_file(url=url)
-        self.pdf_pages =  pdf2image.convert_from_path(pdf_path=self.file, dpi=200)
-        self.__save()
+        with open(self.file, "rb") as file:
+            pages = list(PDFPage.get_pages(fp=file))
+        self.mediaboxes: List[Tuple[float, float, float, float]] = [page.mediabox for page in pages]
+        self.rotations: List[int] = [page.rotate for page in pages]
+    
+    def digest(self) -> str:
+        """Get the digest of the pdf content
+
+        Returns:
+            str: hexadecimal digest
+        """
+        return Metadata.digest(path=self.file)
+    
+    def timestamp(self) -> datetime:
+        """Get the date of the pdf content: modification date of the document, its creation date otherwise
+        
+        The modification time of the file is used when the document has no date
+
+        Returns:
+            datetime: date of the pdf (UTC)
+        """
+        with open(self.file, "rb") as file:
+            document = PDFDocument(PDFParser(file))
+            for key in ('ModDate', 'CreationDate'):
+                for info in document.info:
+                    date = self.__parse_date(resolve1(info.get(key)))
+                    if date is not None:
+                        return date
+        return datetime.fromtimestamp(int(os.path.getmtime(self.file)), tz=timezone.utc)
+    
+    @classmethod
+    def __parse_date(cls, value) -> datetime:
+        """Parse a pdf date
+
+        Args:
+            value: date string of the document information (bytes or str)
+
+        Returns:
+            datetime: parsed date (UTC), None if the value isn't a date
+        """
+        if isinstance(value, bytes):
+            value = value.decode('latin-1')
+        if not isinstance(value, str):
+            return None
+        match = cls.__REGEX_DATE.match(value)
+        if not match:
+            return None
+        year, month, day, hour, minute, second, sign, offset_hour, offset_minute = match.groups()
+        try:
+            date = datetime(int(year), int(month or 1), int(day or 1), int(hour or 0), int(minute or 0), int(second or 0), tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        if sign in ('+', '-'):
+            offset = timedelta(hours=int(offset_hour or 0), minutes=int(offset_minute or 0))
+            date = date - offset if sign == '+' else date + offset
+        return date
     
-    def __save(self) -> None:
-        """save each pdf page into an jpeg image
+    def page_keys(self) -> List[str]:
+        """Get a key identifying the content of each page
+        
+        The key is the digest of the page content streams, the images it draws, its size, the rendering resolution and the words backend
+
+        Returns:
+            List[str]: hexadecimal digest of each page
         """
-        for i, p in enumerate(self.pdf_pages):
-            p.save(f'{self.temp_dir}/{self.PAGE_NAME}{i}.jpg',"JPEG")
+        keys = []
+        with open(self.file, "rb") as file:
+            for page in PDFPage.get_pages(fp=file):
+                sha = hashlib.sha256(f'{self.dpi}:{self.backend.NAME}:{page.mediabox}:{page.rotate}'.encode())
+                streams = list(page.contents)
+                xobjects = resolve1(resolve1(page.resources).get('XObject', {})) if page.resources else {}
+                streams += [xobjects[name] for name in sorted(xobjects)]
+                for stream in streams:
+                    stream = resolve1(stream)
+                    if isinstance(stream, PDFStream):
+                        data = stream.get_rawdata()
+                        sha.update(data if data is not None else stream.get_data())
+                keys.append(sha.hexdigest())
+        return keys
+    
+    def iter_render(self, pages: List[int], save_pages: bool = False) -> Iterator[Tuple[int, PILImage]]:
+        """Convert pdf pages into images one at a time (in page order), the next page is converted in the background while the current one is used
+        
+        Rendered pages aren't kept, so at most two pages are in memory
 
+        Args:
+            pages (List[int]): numbers of the pages to convert (starting from 0)
+            save_pages (bool, optional): also save each page into a jpeg image (used to inspect detection). Defaults to False.
+
+        Yields:
+            Tuple[int, PILImage]: page number and image of each page
+        """
+        pages = sorted(pages)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.__render_page, pages[0]) if len(pages) else None
+            for i, page_number in enumerate(pages):
+                image = future.result()
+                future = executor.submit(self.__render_page, pages[i + 1]) if i + 1 < len(pages) else None
+                if save_pages:
+                    image.save(f'{self.temp_dir}/{self.PAGE_NAME}{page_number}.jpg',"JPEG")
+                yield page_number, image
+                del image
+    
+    def __render_page(self, page_number: int) -> PILImage:
+        """Convert a pdf page into an image
+
+        Args:
+            page_number (int): number of the page (starting from 0)
+
+        Returns:
+            PILImage: image of the page
+        """
+        return pdf2image.convert_from_path(pdf_path=self.file, dpi=self.dpi, first_page=page_number + 1, last_page=page_number + 1)[0]
+    
+    def page_area(self, page_number: int) -> Area:
+        """Get the image area of a page, computed from its media box (as pdftoppm sizes images)
+
+        Args:
+            page_number (int): number of the page (starting from 0)
+
+        Returns:
+            Area: image area of the page
+        """
+        x1, y1, x2, y2 = self.mediaboxes[page_number]
+        w, h = math.ceil(abs(x2 - x1) * self.dpi / 72), math.ceil(abs(y2 - y1) * self.dpi / 72)
+        if self.rotations[page_number] % 180:
+            w, h = h, w
+        return Area(p1=Point(0,0), p2=Point(w,h))
+    
+    def raster_size(self, pages: List[int] = None) -> int:
+        """Estimate the memory used by the pages once rendered (RGB image of each page)
+
+        Args:
+            pages (List[int], optional): numbers of the pages to convert (starting from 0). Defaults to every page.
+
+        Returns:
+            int: size in bytes
+        """
+        if pages is None:
+            pages = list(range(len(self)))
+        size = 0
+        for page_number in pages:
+            area = self.page_area(page_number)
+            size += area.w() * area.h() * 3
+        return size
+    
     def __fetch_file(self, url: str) -> None:
         """Fetch the file whether it is a local or remote file
+        
+        A remote file already downloaded by Metadata.check_update isn't downloaded again
 
         Args:
             url (str): file url
         """
         if Metadata.is_local(url):
-            shutil.copyfile(src=url, dst=self.file)
-        else:
-            request.urlretrieve(url=url, filename=self.file)
+            shutil.copy2(src=url, dst=self.file) # keep the modification time (see timestamp)
+        elif not os.path.exists(self.file):
+            Metadata.fetch_remote(url=url, destination=self.file)
     
-    def gen_pages(self) -> List['Page']:
-        """Generate each page of the pdf with an usable image and a list of words with coordinates
+    def gen_page(self, page_number: int, rendered: PILImage, words: AreaList, contours: AreaList = None, color: bool = True) -> 'Page':
+        """Generate a page from its rendered image and its words
+
+        Args:
+            page_number (int): number of the page (starting from 0)
+            rendered (PILImage): rendered image of the page (see iter_render)
+            words (AreaList): words of the page
+            contours (AreaList, optional): week contours already known (detected otherwise). Defaults to None.
+            color (bool, optional): keep the color plane of the page image (to draw detected elements). Defaults to True.
 
         Returns:
-            List[Page]: list of generated pages
+            Page: generated page
         """
-        pages = [] 
-        with open(self.file, "rb") as file:
-            rsrcmgr = PDFResourceManager()
-            laparams = LAParams()
-            device = PDFPageAggregator(rsrcmgr=rsrcmgr, laparams=laparams)
-            interpreter = PDFPageInterpreter(rsrcmgr=rsrcmgr, device=device)
-            for page_number, page in enumerate(PDFPage.get_pages(fp=file)):
-                image = Image(path=f'{self.temp_dir}/{self.PAGE_NAME}{page_number}.jpg')
-                words = self.__fetch_words(area=image.area, interpreter=interpreter, device=device, page=page)
-                page = Page(image=image, words=words, id=page_number)
-                pages.append(page)
-        return pages
-        
-    def del_pages(self) -> None:
-        """deleted generated images of pages
-        """
-        for page_number in range(0,len(self)):
-            os.remove(path=f'{self.temp_dir}/{self.PAGE_NAME}{page_number}.jpg')
+        image = Image(img=np.asarray(rendered), rgb=True, dpi=self.dpi, color=color)
+        return Page(image=image, words=words, id=page_number, week_coordinate=contours)
+    
+    def fetch_words(self, pages: List[int], areas: Dict[int, Area] = None) -> Dict[int, AreaList]:
+        """Fetch words of pages with their coordinates
+
+        Args:
+            pages (List[int]): numbers of the pages (starting from 0)
+            areas (Dict[int, Area], optional): image area of the pages by page number. Defaults to the area of each page (see page_area).
 
-    def __fetch_words(self, area: Area, interpreter: PDFPageInterpreter, device: PDFPageAggregator, page: PDFPage) -> AreaList:
-        """Featch word on a given pdf page with it's coordinate
+        Returns:
+            Dict[int, AreaList]: list of area with word content by page number
+        """
+        areas = {} if areas is None else areas
+        areas = {n: areas[n] if n in areas else self.page_area(n) for n in pages}
+        return self.backend.fetch(file=self.file, pages=areas, dpi=self.dpi)
+        
+    @classmethod
+    def fetch_page_words(cls, file: str, page_number: int, area: Area, words: str = LayoutWords.NAME, dpi: int = DPI) -> AreaList:
+        """Fetch words of a single pdf page (used when pages are parsed separately)
 
         Args:
+            file (str): pdf file path
+            page_number (int): number of the page (starting from 0)
             area (Area): image area of the page
-            interpreter (PDFPageInterpreter): page interpreter 
-            device (PDFPageAggregator): page aggregator
-            page (PDFPage): page itself
+            words (str, optional): name of the backend fetching words (see WordBackend). Defaults to LayoutWords.NAME.
+            dpi (int, optional): resolution of the page image. Defaults to DPI.
 
         Returns:
             AreaList: list of area with word content
         """
-        words = AreaList()
-        interpreter.process_page(page=page)
-        layout = device.get_result()
-        for element in layout:
-            if isinstance(element, LTTextBoxHorizontal):
-                for text_line in element._objs:
-                    t = tuple(e*(200/72) for e in text_line.bbox)
-                    a = Area(p1=Point(int(t[0]),int(area.h() - t[3])), p2=Point(int(t[2]),int(area.h() - t[1])), content=text_line.get_text().strip())
-                    words.append(a)
-        return words
-    
+        return WordBackend.get(words).fetch(file=file, pages={page_number: area}, dpi=dpi)[page_number]
+
+    def del_pages(self) -> None:
+        """deleted generated images of pages (if any)
+        """
+        for page_number in range(0,len(self)):
+            path = f'{self.temp_dir}/{self.PAGE_NAME}{page_number}.jpg'
+            if os.path.exists(path):
+                os.remove(path=path)
+
     def __len__(self) -> int:
         """Get the number of page
 
         Returns:
             int: number of pages
         """
-        return len(self.pdf_pages)
\ No newline at end of file
+        return len(self.mediaboxes)
\ No newline at end of file
@@ -0,0 +1,47 @@
+import subprocess
+import xml.etree.ElementTree as ElementTree
+from typing import Dict
+
+from geometry import Area, AreaList
+
+from .wordbackend import WordBackend
+
+
+class PdftotextWords(WordBackend):
+    """Backend fetching text lines with poppler pdftotext (bounding boxes of its layout mode), run once for all fetched pages
+    """
+    NAME = 'pdftotext'
+    DOCUMENT = True
+    __NAMESPACE = '{http://www.w3.org/1999/xhtml}'
+    """namespace of the generated xhtml
+    """
+    
+    def fetch(self, file: str, pages: Dict[int, Area], dpi: int) -> Dict[int, AreaList]:
+        """Fetch text lines of pdf pages with their coordinates
+
+        Args:
+            file (str): pdf file path
+            pages (Dict[int, Area]): image area of each page to fetch by page number (starting from 0)
+            dpi (int): resolution of page images
+
+        Returns:
+            Dict[int, AreaList]: list of area with line content by page number
+        """
+        words = {}
+        if not len(pages):
+            return words
+        first, last = min(pages), max(pages)
+        command = ['pdftotext', '-bbox-layout', '-f', str(first + 1), '-l', str(last + 1), file, '-']
+        result = subprocess.run(command, capture_output=True, check=True)
+        document = ElementTree.fromstring(result.stdout)
+        for page_number, page in enumerate(document.iter(f'{self.__NAMESPACE}page'), start=first):
+            if page_number not in pages:
+                continue
+            height = float(page.get('height'))
+            words[page_number] = AreaList()
+            for line in page.iter(f'{self.__NAMESPACE}line'):
+                text = ' '.join(word.text or '' for word in line.iter(f'{self.__NAMESPACE}word'))
+                # pdftotext coordinates are from the top left corner
+                bbox = (float(line.get('xMin')), height - float(line.get('yMax')), float(line.get('xMax')), height - float(line.get('yMin')))
+                words[page_number].append(self._area(bbox, text, pages[page_number], dpi))
+        return words
@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+
+from geometry import Area, AreaList, Point
+
+
+class WordBackend(ABC):
+    """Base class of the backends extracting text lines of pdf pages with their area (in pixel coordinates of the rendered pages)
+    
+    A backend is selected by its name (see get())
+    """
+    NAME: str = None
+    """name of the backend (used in configuration)
+    """
+    DOCUMENT: bool = False
+    """whether the backend is faster on the whole document at once than on separated pages
+    """
+    
+    @classmethod
+    def get(cls, name: str) -> 'WordBackend':
+        """Get a backend by its name
+
+        Args:
+            name (str): backend name
+
+        Raises:
+            ValueError: there is no backend with this name
+
+        Returns:
+            WordBackend: instance of the backend
+        """
+        for backend in cls.__subclasses__():
+            if backend.NAME == name:
+                return backend()
+        raise ValueError(f"Unknown word backend \"{name}\", must be one of {', '.join(b.NAME for b in cls.__subclasses__())}")
+    
+    @abstractmethod
+    def fetch(self, file: str, pages: Dict[int, Area], dpi: int) -> Dict[int, AreaList]:
+        """Fetch text lines of pdf pages with their coordinates
+
+        Args:
+            file (str): pdf file path
+            pages (Dict[int, Area]): image area of each page to fetch by page number (starting from 0)
+            dpi (int): resolution of page images
+
+        Returns:
+            Dict[int, AreaList]: list of area with line content by page number
+        """
+    
+    @staticmethod
+    def _area(bbox: Tuple[float, float, float, float], content: str, area: Area, dpi: int) -> Area:
+        """Convert a line box in pdf coordinates (points from the bottom left corner) into an area of the rendered page
+
+        Args:
+            bbox (Tuple[float, float, float, float]): x0, y0, x1, y1 of the line in points
+            content (str): text of the line
+            area (Area): image area of the page
+            dpi (int): resolution of page images
+
+        Returns:
+            Area: area of the line with its text
+        """
+        t = tuple(e*(dpi/72) for e in bbox)
+        return Area(p1=Point(int(t[0]),int(area.h() - t[3])), p2=Point(int(t[2]),int(area.h() - t[1])), content=content.strip())
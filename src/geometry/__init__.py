@@ -1,4 +1,6 @@
 from .area import Area
+from .areaarray import AreaArray
+from .areaindex import AreaIndex
 from .arealist import AreaList
 from .axe import Axe
 from .axetype import AxeType
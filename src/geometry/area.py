@@ -9,6 +9,8 @@ from .range import Range
 class Area:
     """Class defining a surface with 2 points and optionaly a content in it
     """
+    __slots__ = ('p1', 'p2', 'content')
+    
     def __init__(self, p1: Point = None, p2: Point = None, x : int = None, y : int = None, w: int = None, h: int = None, content: Any = None) -> None:
         """Constructor of an Area with 2 points or x,y,w,h values
 
@@ -159,6 +161,14 @@ class Area:
         """
         return Point((self.x2() + self.x1())/2, (self.y2() + self.y1())/2)
     
+    def copy(self) -> 'Area':
+        """Get a copy of this area (points are never modified in place so they are shared, as is the content)
+
+        Returns:
+            Area: copied area
+        """
+        return Area(p1=self.p1, p2=self.p2, content=self.content)
+    
     def resize(self, area: 'Area') -> None:
         """Resize this area with the given area
 
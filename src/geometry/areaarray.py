@@ -0,0 +1,45 @@
+from typing import Any, List
+
+import numpy as np
+
+from .area import Area
+from .point import Point
+
+
+class AreaArray:
+    """Columnar list of areas, coordinates (x1, y1, x2, y2) are stored in a single integer array with a parallel list of contents
+
+    It's compact to store or to send to another process (see AreaList.array()), its coordinates can be read as a whole (see Placement)
+    """
+    
+    def __init__(self, areas: List[Area] = None) -> None:
+        """Constructor of AreaArray from a list of areas
+
+        Args:
+            areas (List[Area], optional): areas to store. Defaults to None (empty array).
+        """
+        areas = [] if areas is None else areas
+        self.coordinates: np.ndarray = np.array([(a.x1(), a.y1(), a.x2(), a.y2()) for a in areas], dtype=np.int64).reshape(-1, 4)
+        self.contents: List[Any] = [a.content for a in areas]
+    
+    def to_list(self) -> 'AreaList':
+        """Get the areas as objects
+
+        Returns:
+            AreaList: new list of areas (modifying them doesn't modify this array)
+        """
+        areas = AreaList()
+        for (x1, y1, x2, y2), content in zip(self.coordinates.tolist(), self.contents):
+            areas.append(Area(p1=Point(x1, y1), p2=Point(x2, y2), content=content))
+        return areas
+    
+    def __len__(self) -> int:
+        """Get the number of areas
+
+        Returns:
+            int: number of areas
+        """
+        return len(self.contents)
+
+# prevent circular import
+from .arealist import AreaList
\ No newline at end of file
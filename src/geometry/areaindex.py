@@ -0,0 +1,110 @@
+import bisect
+from typing import Dict, List, Tuple
+
+from .area import Area
+from .axetype import AxeType
+from .point import Point
+from .range import Range
+
+
+class AreaIndex:
+    """Spatial index of a list of areas (uniform grid of cells and sorted coordinates)
+    
+    Queries return indices of areas (in the order of the indexed list), the index must be rebuilt when areas are modified
+    """
+    
+    def __init__(self, areas: List[Area], cell: int = None) -> None:
+        """Constructor of AreaIndex, register each area in the cells it overlaps
+
+        Args:
+            areas (List[Area]): areas to index
+            cell (int, optional): size of a cell. Defaults to the average size of areas.
+        """
+        self.areas = areas
+        if cell is None:
+            cell = int(sum(a.w() + a.h() for a in areas) / (2 * len(areas))) if len(areas) else 1
+        self.cell = max(1, cell)
+        self.__cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, a in enumerate(areas):
+            for cx in range(self.__coordinate(a.x1()), self.__coordinate(a.x2()) + 1):
+                for cy in range(self.__coordinate(a.y1()), self.__coordinate(a.y2()) + 1):
+                    self.__cells.setdefault((cx, cy), []).append(i)
+        self.__sorted: Dict[AxeType, Tuple[List[int], List[int]]] = {}
+    
+    def bounding(self, point: Point) -> List[int]:
+        """Get areas where the given point is inside
+
+        Args:
+            point (Point): point to check
+
+        Returns:
+            List[int]: indices of areas bounding this point
+        """
+        cell = self.__cells.get((self.__coordinate(point.x), self.__coordinate(point.y)), [])
+        return [i for i in cell if self.areas[i].in_bound(point)]
+    
+    def contained(self, area: Area) -> List[int]:
+        """Get areas contained by the given area
+
+        Args:
+            area (Area): area reference
+
+        Returns:
+            List[int]: indices of areas contained by this area
+        """
+        return [i for i in self.__candidates(area) if area.contain(self.areas[i])]
+    
+    def centers_in(self, area: Area) -> List[int]:
+        """Get areas with their center inside the given area
+
+        Args:
+            area (Area): area reference
+
+        Returns:
+            List[int]: indices of areas centered in this area
+        """
+        return [i for i in self.__candidates(area) if area.in_bound(self.areas[i].center())]
+    
+    def between(self, axe_range: Range) -> List[int]:
+        """Get areas (strictly) between the given range
+
+        Args:
+            axe_range (Range): range reference
+
+        Returns:
+            List[int]: indices of areas between this range
+        """
+        if axe_range.axe not in self.__sorted:
+            key = (lambda a: a.x1()) if axe_range.axe == AxeType.ABSCISSA else (lambda a: a.y1())
+            order = sorted(range(len(self.areas)), key=lambda i: key(self.areas[i]))
+            self.__sorted[axe_range.axe] = ([key(self.areas[i]) for i in order], order)
+        coordinates, order = self.__sorted[axe_range.axe]
+        first = bisect.bisect_right(coordinates, axe_range.a)
+        last = bisect.bisect_left(coordinates, axe_range.b)
+        return sorted(i for i in order[first:last] if axe_range.is_between(area=self.areas[i]))
+    
+    def __candidates(self, area: Area) -> List[int]:
+        """Get areas registered in cells overlapping the given area
+
+        Args:
+            area (Area): area reference
+
+        Returns:
+            List[int]: indices of candidate areas (sorted)
+        """
+        candidates = set()
+        for cx in range(self.__coordinate(area.x1()), self.__coordinate(area.x2()) + 1):
+            for cy in range(self.__coordinate(area.y1()), self.__coordinate(area.y2()) + 1):
+                candidates.update(self.__cells.get((cx, cy), []))
+        return sorted(candidates)
+    
+    def __coordinate(self, value: float) -> int:
+        """Get the cell coordinate of a value
+
+        Args:
+            value (float): coordinate on an axe
+
+        Returns:
+            int: cell coordinate
+        """
+        return int(value // self.cell)
@@ -1,8 +1,8 @@
-import copy
 from re import Pattern
-from typing import List
+from typing import Any, Callable, List
 
 from .area import Area
+from .areaindex import AreaIndex
 from .point import Point
 
 
@@ -31,48 +31,114 @@ class AreaList(List[Area]):
         """
         return self[0]
     
-    def contained(self, area: Area, remove: bool = False) -> 'AreaList':
+    def index(self, cell: int = None) -> AreaIndex:
+        """Build a spatial index of this list (to answer many queries on it)
+        
+        The index must be rebuilt when this list or its areas are modified
+
+        Args:
+            cell (int, optional): size of index cells. Defaults to the average size of areas.
+
+        Returns:
+            AreaIndex: index of this list
+        """
+        return AreaIndex(self, cell)
+    
+    def array(self) -> 'AreaArray':
+        """Get a columnar copy of this list (compact to store or to send to another process)
+
+        Returns:
+            AreaArray: array of areas of this list
+        """
+        return AreaArray(self)
+    
+    def copy(self) -> 'AreaList':
+        """Get a copy of this list with a copy of each area (their content is shared)
+
+        Returns:
+            AreaList: copied list
+        """
+        areas = AreaList()
+        areas.extend(a.copy() for a in self)
+        return areas
+    
+    def contained(self, area: Area, remove: bool = False, index: AreaIndex = None) -> 'AreaList':
         """Get areas contained by the given area
+        
+        Found areas are not copied, they are shared with (or moved from) this list
 
         Args:
             area (Area): area reference
             remove (bool, optional): if set to True, delete from the list any found area. Defaults to False.
+            index (AreaIndex, optional): index of this list used to find areas (can't be used to remove areas). Defaults to None.
 
         Returns:
             AreaList: list of found area
         """
-        sub = AreaList()
-        i = 0
-        while(i < len(self)):
-            if area.contain(self[i]):
-                sub.append(copy.deepcopy(self[i]))
-                if remove:
-                    self.remove(self[i])
-                    i-=1
-            i+=1
-        return sub
+        if index is not None:
+            assert not remove, "An index can't be used to remove areas"
+            sub = AreaList()
+            sub.extend(self[i] for i in index.contained(area))
+            return sub
+        return self.__split(area.contain, remove)
 
     def match(self, pattern: Pattern, remove: bool = False) -> 'AreaList':
         """Get areas with content matching this pattern.
         
-        Area content should be string
+        Area content should be string. Found areas are not copied, they are shared with (or moved from) this list
 
         Args:
             pattern (Pattern): regex pattern
             remove (bool, optional): if set to True, delete from the list any found area. Defaults to False.
 
+        Returns:
+            AreaList: list of found area
+        """
+        return self.__split(lambda a: pattern.match(a.content), remove)
+    
+    def partition(self, patterns: List[Pattern]) -> List['AreaList']:
+        """Move areas matching each pattern into their own list in a single pass over this list
+        
+        Area content should be string. An area goes into the list of the first pattern it matches,
+        areas matching no pattern stay in this list
+
+        Args:
+            patterns (List[Pattern]): regex patterns
+
+        Returns:
+            List[AreaList]: list of found area for each pattern
+        """
+        subs = [AreaList() for _ in patterns]
+        kept = []
+        for a in self:
+            for pattern, sub in zip(patterns, subs):
+                if pattern.match(a.content):
+                    sub.append(a)
+                    break
+            else:
+                kept.append(a)
+        self[:] = kept
+        return subs
+    
+    def __split(self, found: Callable[[Area], Any], remove: bool) -> 'AreaList':
+        """Get areas for which found is true in a single pass over this list
+
+        Args:
+            found (Callable[[Area], Any]): predicate on areas
+            remove (bool): if set to True, delete from the list any found area
+
         Returns:
             AreaList: list of found area
         """
         sub = AreaList()
-        i = 0
-        while(i < len(self)):
-            if pattern.match(self[i].content):
-                sub.append(copy.deepcopy(self[i]))  
-                if remove:
-                    self.remove(self[i])
-                    i-=1
-            i+=1
+        kept = []
+        for a in self:
+            if found(a):
+                sub.append(a)
+            else:
+                kept.append(a)
+        if remove:
+            self[:] = kept
         return sub
     
     def change_origin(self, point: Point) -> None:
@@ -82,4 +148,7 @@ class AreaList(List[Area]):
             point (Point): origin point
         """
         for w in self:
-            w.change_origin(point)
\ No newline at end of file
+            w.change_origin(point)
+
+# prevent circular import
+from .areaarray import AreaArray
\ No newline at end of file
@@ -4,6 +4,7 @@ from typing import Tuple
 class Point:
     """Class representing a point with too coordinates
     """
+    __slots__ = ('x', 'y')
     
     def __init__(self, x: int, y: int) -> None:
         """Costructor of Point with too coordinates
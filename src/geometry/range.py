@@ -6,6 +6,7 @@ from .axetype import AxeType
 class Range:
     """Class representing a range on an axe
     """
+    __slots__ = ('a', 'b', 'axe')
     
     def __init__(self, a: int, b: int, axe: AxeType) -> None:
         """Constructor of range
@@ -36,6 +37,17 @@ class Range:
         """
         return abs(self.b - self.a)
     
+    def scale(self, factor: float) -> 'Range':
+        """Get this range with both coordinates multiplied by a factor (to change its unit)
+
+        Args:
+            factor (float): multiplication factor
+
+        Returns:
+            Range: scaled range
+        """
+        return Range(self.a * factor, self.b * factor, self.axe)
+    
     def is_between(self, area: 'area.Area') -> bool:
         """Check if an area is between this range
 
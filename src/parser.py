@@ -1,16 +1,19 @@
-import ftplib
+import datetime
 import getopt
 import os
 import sys
-import time
 import urllib
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
 
+import cv2
 import requests
+from PIL.Image import Image as PILImage
 
-from files import Metadata, Page, Pdf
-from schedule import Course, Week, EdtCalendar
-from utils import Environnement, FtpHandler
+from files import LayoutWords, Metadata, Page, PageCache, PagePool, Pdf
+from geometry import Area, AreaArray, AreaList, Point
+from schedule import Course, EdtCalendar, Week
+from utils import Environnement, FtpPublisher, MemoryBudget, Metrics, MetricsExporter, PollingPolicy, Scheduler
 
 VERSION = '1.3.1'
 HELP = ("This script parses a pdf schedule.\n"
@@ -27,6 +30,18 @@ HELP = ("This script parses a pdf schedule.\n"
         "   --version               show version of script\n"
         "\n"
         "Runs on python3 with dependences listed on requirements.txt\n")
+PAGE_POOL: PagePool = None
+"""Pool parsing pages in parallel (None when pages are parsed sequentially)
+"""
+PAGE_CACHE: PageCache = None
+"""Cache of parsed pages (None when disabled)
+"""
+FTP_PUBLISHER: FtpPublisher = None
+"""Publisher sending ics files in the background (None when there is no ftp connexion)
+"""
+METRICS: MetricsExporter = None
+"""Exporter of the metrics of each level (None when metrics aren't exported)
+"""
 
 def version() -> None:
    """Print the verison of this script
@@ -39,26 +54,68 @@ def help() -> None:
    print(HELP)
 
 def loop_time() -> None:
-   """Loop for forever, with a delay of 'TIME' seconds (with TIME provided by the user through config/env/cli) 
+   """Process each level forever on its own polling policy, 'TIME' seconds (provided by the user through config/env/cli) being the default interval
+   
+   A level can set its own 'interval', 'jitter', maximum 'backoff' factor and 'periods' of the day with another interval (see PollingPolicy)
    """
    delay = int(GENERAL['time'])
    print(f"Starting script, with refresh delay of {delay} sec")
-   while(True):
-      processing_levels()
-      print(f"Waiting for {delay} sec")
-      time.sleep(delay)
+   workers, budget = prepare_levels()
+   policies = {schedule: PollingPolicy(value, delay) for schedule, value in SCHEDULES.items()}
+   Scheduler(policies, workers).run(lambda schedule: processing_level(schedule, budget))
+
+def processing_level(level: str, budget: MemoryBudget) -> bool:
+   """Process a level on its own (scheduled run), metrics are written once done
+
+   Args:
+       level (str): level given by the user
+       budget (MemoryBudget): memory budget shared with the other levels for rendered pages
+
+   Returns:
+       bool: True if the pdf changed (parsed into new calendars), False otherwise
+   """
+   metrics = METRICS.level(level) if METRICS is not None else None
+   try:
+      status = parsing_edt(level, SCHEDULES[level]['url'], GENERAL['workdir'], GENERAL['output'], budget, metrics)
+   finally:
+      if METRICS is not None:
+         METRICS.write()
+   return status == 'parsed'
+
+def prepare_levels() -> Tuple[int, MemoryBudget]:
+   """Create the working and output folders, then share cores between levels processed at the same time
+
+   Returns:
+       tuple: number of levels processed at the same time and memory budget shared between them
+   """
+   mkdir_if_not_exists(GENERAL['workdir'])
+   mkdir_if_not_exists(GENERAL['output'])
+   workers = int(GENERAL['level_workers']) if 'level_workers' in GENERAL else len(SCHEDULES)
+   workers = max(1, min(workers, len(SCHEDULES)))
+   budget = MemoryBudget(int(GENERAL['memory_budget']) * 1024 * 1024 if 'memory_budget' in GENERAL else None)
+   cv2.setNumThreads(max(1, (os.cpu_count() or 1) // workers)) # share cores between levels parsed at the same time
+   return workers, budget
    
 def processing_levels() -> None:
    """Process each level given by the user
    """
    workdir: str = GENERAL['workdir'] 
    output: str = GENERAL['output']
-   mkdir_if_not_exists(workdir)
-   for schedule, value in SCHEDULES.items():
-      print(f"Processing {schedule} pdf")
-      parsing_edt(schedule, value['url'], workdir, output)
-
-def parsing_edt(level: str, url: str, workdir: str, ics_dir: str) -> None:
+   workers, budget = prepare_levels()
+   try:
+      with ThreadPoolExecutor(max_workers=workers) as executor:
+         futures = []
+         for schedule, value in SCHEDULES.items():
+            print(f"Processing {schedule} pdf")
+            metrics = METRICS.level(schedule) if METRICS is not None else None
+            futures.append(executor.submit(parsing_edt, schedule, value['url'], workdir, output, budget, metrics))
+         for future in futures:
+            future.result()
+   finally:
+      if METRICS is not None:
+         METRICS.write()
+
+def parsing_edt(level: str, url: str, workdir: str, ics_dir: str, budget: MemoryBudget = None, metrics: Metrics = None) -> str:
    """Parse the edt into ics files and send them over ftp
 
    Args:
@@ -66,36 +123,157 @@ def parsing_edt(level: str, url: str, workdir: str, ics_dir: str) -> None:
        url (str): edt url of the given level
        workdir (str): script working directory
        ics_dir (str): ics output script
+       budget (MemoryBudget, optional): memory budget shared with the other levels for rendered pages. Defaults to None (a budget without limit for this call).
+       metrics (Metrics, optional): metrics of the stages of this level. Defaults to metrics which aren't exported.
+
+   Returns:
+       str: result of the processing (parsed, skipped or error)
    """
+   metrics = Metrics(level) if metrics is None else metrics
+   budget = MemoryBudget() if budget is None else budget
    level_workdir = f"{workdir}/{level}"
    mkdir_if_not_exists(level_workdir)
+   status = 'error'
    try: 
-      if edt_need_update(url, level_workdir):
-         print(f"{level} : Download and convert pdf into image and words")
-         pdf = Pdf(url ,level_workdir)
-         print(f"{level} : Processing and parsing images and words")
-         pages = pdf.gen_pages()
-         pdf.del_pages()
-         print(f"{level} : Gen weeks from {len(pages)} pages")
-         weeks = gen_weeks(level_workdir, pages)
-         print(f"{level} : Get courses from {len(weeks)} weeks")
-         courses = gen_courses(level_workdir, weeks)
+      with metrics.stage('fetch'):
+         updated = edt_need_update(url, level_workdir)
+      if updated:
+         print(f"{level} : Download pdf")
+         with metrics.stage('fetch'):
+            pdf = Pdf(url ,level_workdir, GENERAL['words'] if 'words' in GENERAL else LayoutWords.NAME, get_dpi(level))
+            digest = pdf.digest()
+         if edt_already_parsed(digest, level_workdir, ics_dir):
+            print(f"{level} : Skiping, pdf content is the same than the last parsed pdf")
+            send(level, Metadata.load_parsed(level_workdir)['files'], level_workdir, ics_dir, metrics)
+            status = 'skipped'
+            return status
+         courses = parsing_pdf(level, level_workdir, pdf, budget, metrics)
          print(f"{level} : Generate ics callendars from {len(courses)} courses")
-         files_name = gen_calendars(courses, level, ics_dir)
-         if len(FTP):
-            print(f"{level} : Sending files through ftp")
-            send(files_name, ics_dir)
+         with metrics.stage('calendars') as stage:
+            files_name = gen_calendars(courses, level, ics_dir, pdf.timestamp())
+            stage['items'] = len(files_name)
+         Metadata.save_parsed(level_workdir, digest, files_name)
+         send(level, files_name, level_workdir, ics_dir, metrics)
+         status = 'parsed'
       else:
-         print("Skiping, local pdf is older than remote pdf")
-   except (requests.exceptions.ConnectionError, urllib.error.URLError, ftplib.error_reply, ftplib.error_temp, ftplib.error_perm, ftplib.error_proto):
-      print("Connexion error")
+         print(f"{level} : Skiping, local pdf is older than remote pdf")
+         send(level, Metadata.load_parsed(level_workdir).get('files', []), level_workdir, ics_dir, metrics)
+         status = 'skipped'
+   except (requests.exceptions.ConnectionError, requests.exceptions.HTTPError, urllib.error.URLError):
+      print(f"{level} : Connexion error")
       delete_if_exists(f"{level_workdir}/{Pdf.PDF_NAME}") 
-      return
+      return status
+   finally:
+      metrics.finish(status)
+   return status
+
+def parsing_pdf(level: str, level_workdir: str, pdf: Pdf, budget: MemoryBudget, metrics: Metrics) -> List[Course]:
+   """Parse the pdf into courses, pages found in the page cache are neither rendered nor analyzed
+
+   Args:
+       level (str): level given by the user
+       level_workdir (str): level working directory
+       pdf (Pdf): downloaded pdf
+       budget (MemoryBudget): memory budget shared with the other levels for rendered pages
+       metrics (Metrics): metrics of the stages of this level
+
+   Returns:
+       list: list of the courses generated
+   """
+   keys = gen_page_keys(pdf)
+   cached = {n: PAGE_CACHE.get(k) for n, k in enumerate(keys) if k is not None}
+   cached = {n: entry for n, entry in cached.items() if entry is not None}
+   pages = [n for n in range(len(pdf)) if n not in cached or not cached[n]['complete']]
+   print(f"{level} : {len(pdf) - len(pages)} pages found in cache")
+   window = sorted(pages, key=lambda n: pdf.raster_size([n]), reverse=True)[:(PAGE_POOL.workers if PAGE_POOL is not None else 1) + 2]
+   with budget.reserve(pdf.raster_size(window)): # pages rendered at the same time (see analyze_pages)
+      entries = analyze_pages(level, level_workdir, pdf, pages, cached, metrics)
+   courses: List[Course] = []
+   for n, key in enumerate(keys):
+      if n in entries:
+         if key is not None:
+            PAGE_CACHE.put(key, entries[n])
+         courses += entries[n]['courses']
+      else:
+         courses += cached[n]['courses']
+   courses.sort(key=lambda x: x.begin)
+   if 'print' in GENERAL and GENERAL['print']:
+      print_courses(courses)
+   return courses
+
+def analyze_pages(level: str, level_workdir: str, pdf: Pdf, pages: List[int], cached: Dict[int, dict], metrics: Metrics) -> Dict[int, dict]:
+   """Convert the given pages into images and words then parse them into courses, one page at a time
+   
+   The next page is rendered while the current one is analyzed and a page is released once its courses are generated,
+   so memory doesn't depend on the number of pages (with a page pool, a page more than the number of workers is analyzed at once)
+
+   Args:
+       level (str): level given by the user
+       level_workdir (str): level working directory
+       pdf (Pdf): downloaded pdf
+       pages (list): numbers of the pages to analyze
+       cached (dict): cache entries of the pages by page number
+       metrics (Metrics): metrics of the stages of this level
+
+   Returns:
+       dict: entry (words, contours, courses, time axe and completeness) of each analyzed page by page number
+   """
+   print(f"{level} : Convert {len(pages)} pages into image and words then gen weeks")
+   words = {n: cached[n]['words'] for n in pages if n in cached}
+   contours = {n: cached[n]['contours'] for n in pages if n in cached}
+   time_axes = {}
+   time_axe_ref = None
+   n_ref = 0
+   waiting: List[Tuple[int, AreaArray, AreaList, List[Week]]] = []
+   entries = {}
+   for n, (page_words, page_contours, weeks) in gen_weeks(level_workdir, pdf, pages, words, contours, metrics):
+      time_axes[n] = next((w.hours.time_axe for w in weeks if len(w.hours.time_axe)), None)
+      while n_ref < len(pdf) and time_axe_ref is None and (n_ref in time_axes or n_ref not in pages): # get a reference (first time axe of the pdf)
+         time_axe_ref = time_axes[n_ref] if n_ref in time_axes else cached[n_ref]['time_axe']
+         n_ref+=1
+      waiting.append((n, page_words, page_contours, weeks))
+      if time_axe_ref is not None or all(len(w.hours.time_axe) for page in waiting for w in page[3]): # weeks without time axe wait for the reference
+         for page in waiting:
+            entries[page[0]] = gen_entry(level, level_workdir, *page, time_axes[page[0]], time_axe_ref, metrics)
+         waiting = []
+   for page in waiting:
+      entries[page[0]] = gen_entry(level, level_workdir, *page, time_axes[page[0]], time_axe_ref, metrics)
+   if not is_detect_mode():
+      pdf.del_pages()
+   return entries
+
+def gen_entry(level: str, level_workdir: str, n: int, words: AreaArray, contours: AreaList, weeks: List[Week], time_axe: list, time_axe_ref: list, metrics: Metrics) -> dict:
+   """Generate the courses of an analyzed page, weeks without time axe use the reference time axe
+
+   Args:
+       level (str): level given by the user
+       level_workdir (str): level working directory
+       n (int): number of the page
+       words (AreaArray): words of the page
+       contours (AreaList): week contours of the page
+       weeks (list): weeks of the page
+       time_axe (list): first time axe of the page (None if there is none)
+       time_axe_ref (list): reference time axe of the pdf (None if there is none)
+       metrics (Metrics): metrics of the stages of this level
+
+   Returns:
+       dict: entry (words, contours, courses, time axe and completeness) of the page
+   """
+   complete = all(len(w.hours.time_axe) for w in weeks)
+   for week in weeks:
+      if not len(week.hours.time_axe) and time_axe_ref is not None:
+         week.hours.time_axe = time_axe_ref
+   print(f"{level} : Get courses from {len(weeks)} weeks of page {n}")
+   with metrics.stage('courses') as stage:
+      courses = gen_courses(level_workdir, weeks)
+      stage['items'] = len(courses)
+   return {'words': words, 'contours': contours, 'courses': courses, 'time_axe': time_axe, 'complete': complete}
 
 def edt_need_update(url : str, level_workdir : str) -> bool:
    """Define if the edt need an update :
       - when attribute 'FORCE' is used
-      - when target pdf is newer than the local pdf
+      - when target pdf is newer than the local pdf (a remote pdf is then downloaded)
+      - when the local pdf isn't the last parsed pdf (the last run failed after it was fetched)
 
    Args:
        url (str): edt file url
@@ -104,34 +282,106 @@ def edt_need_update(url : str, level_workdir : str) -> bool:
    Returns:
        bool: True if edt need update, False otherwise
    """
-   return ('force' in GENERAL and GENERAL['force']) or Metadata.check_update(url, f'{level_workdir}/{Pdf.PDF_NAME}')
+   file = f'{level_workdir}/{Pdf.PDF_NAME}'
+   updated = Metadata.check_update(url, file)
+   unparsed = os.path.exists(file) and Metadata.load_parsed(level_workdir).get('digest') != Metadata.digest(file)
+   return ('force' in GENERAL and GENERAL['force']) or updated or unparsed
 
-def gen_weeks(level_workdir: str, pages: List[Page]) -> List[Week]:
-   """Generate weeks from pages
+def edt_already_parsed(digest: str, level_workdir: str, ics_dir: str) -> bool:
+   """Define if the edt was already parsed (unless attribute 'FORCE' is used) :
+      - when the pdf content is the same than the last parsed pdf
+      - and the calendars generated from it are still there
 
    Args:
+       digest (str): digest of the pdf content
        level_workdir (str): level working directory
-       pages (list): pages object of edt
+       ics_dir (str): ics directory
 
    Returns:
-       list: the weeks generated
+       bool: True if the edt was already parsed, False otherwise
    """
-   weeks: List[Week] = []
-   for page in pages:
-      weeks += page.gen_weeks()
-      if 'detect' in GENERAL and GENERAL['detect']:
-         detect_words(page, f'{level_workdir}/detected')
-   i = 0
-   time_axe_ref = None
-   while i < len(weeks) and time_axe_ref is None: # get a reference 
-      if len(weeks[i].hours.time_axe):
-         time_axe_ref = weeks[i].hours
-      i+=1
-   for week in weeks:
-      if not len(week.hours.time_axe) and time_axe_ref is not None:
-         week.hours = time_axe_ref
-   return weeks
+   if 'force' in GENERAL and GENERAL['force']:
+      return False
+   parsed = Metadata.load_parsed(level_workdir)
+   return parsed.get('digest') == digest and all(os.path.exists(f'{ics_dir}/{f}') for f in parsed['files'])
+
+def gen_page_keys(pdf: Pdf) -> List[str]:
+   """Get the cache key of each page (page content and month, as week years depend on the current date)
    
+   The cache isn't used when it's disabled or when attribute 'FORCE' or 'DETECT' is used
+
+   Args:
+       pdf (Pdf): downloaded pdf
+
+   Returns:
+       list: key of each page (None when the cache isn't used)
+   """
+   if PAGE_CACHE is None or is_detect_mode() or ('force' in GENERAL and GENERAL['force']):
+      return [None] * len(pdf)
+   month = datetime.date.today().strftime('%Y-%m')
+   return [f'{key}-{month}' for key in pdf.page_keys()]
+
+def gen_weeks(level_workdir: str, pdf: Pdf, pages: List[int], words: Dict[int, AreaArray], contours: Dict[int, AreaList], metrics: Metrics) -> Iterator[Tuple[int, Tuple[AreaArray, AreaList, List[Week]]]]:
+   """Generate weeks from pages as they are rendered, in parallel when a page pool is available
+
+   Args:
+       level_workdir (str): level working directory
+       pdf (Pdf): pdf of edt
+       pages (list): numbers of the pages to analyze
+       words (dict): words already known by page number
+       contours (dict): week contours already known by page number
+       metrics (Metrics): metrics of the stages of this level (with a page pool, times are summed over the workers)
+
+   Yields:
+       tuple: page number with its words, week contours and weeks (in page order)
+   """
+   detect_folder = f'{level_workdir}/detected'
+   if pdf.backend.DOCUMENT: # fetch missing words at once rather than for each page
+      with metrics.stage('words'):
+         fetched = pdf.fetch_words([n for n in pages if n not in words])
+      words = {**{n: w.array() for n, w in fetched.items()}, **words}
+   rendered = render_pages(pdf, pages, metrics)
+   if PAGE_POOL is not None:
+      if is_detect_mode():
+         mkdir_if_not_exists(detect_folder)
+      yield from PAGE_POOL.gen_weeks(pdf, rendered, detect_folder if is_detect_mode() else None, words, contours, metrics)
+      return
+   for n, image in rendered:
+      if n not in words:
+         with metrics.stage('words'):
+            words[n] = pdf.fetch_words([n], {n: Area(p1=Point(0,0), p2=Point(*image.size))})[n].array()
+      with metrics.stage('pages') as stage:
+         page = pdf.gen_page(n, image, words[n].to_list(), contours.get(n), is_detect_mode())
+         stage['items'] = 1
+      del image
+      with metrics.stage('weeks') as stage:
+         weeks = page.gen_weeks()
+         stage['items'] = len(weeks)
+      if is_detect_mode():
+         detect_words(page, detect_folder)
+      yield n, (words[n], page.week_coordinate, weeks)
+      del page, weeks
+
+def render_pages(pdf: Pdf, pages: List[int], metrics: Metrics) -> Iterator[Tuple[int, PILImage]]:
+   """Render pages one at a time, the next page being rendered in the background (see Pdf.iter_render)
+
+   Args:
+       pdf (Pdf): pdf of edt
+       pages (list): numbers of the pages to render
+       metrics (Metrics): metrics of the stages of this level (rasterize only counts the time spent waiting for a page)
+
+   Yields:
+       tuple: page number and image of each page
+   """
+   rendered = pdf.iter_render(pages, save_pages=is_detect_mode())
+   while True:
+      with metrics.stage('rasterize') as stage:
+         page = next(rendered, None)
+         stage['items'] = int(page is not None)
+      if page is None:
+         return
+      yield page
+      del page
 
 def gen_courses(level_workdir: str, weeks: List[Week]) -> List[Course]:
    """Generate the courses from the pdf data
@@ -145,24 +395,22 @@ def gen_courses(level_workdir: str, weeks: List[Week]) -> List[Course]:
    """
    courses: List[Course] = []
    for week in weeks:
-      if 'detect' in GENERAL and GENERAL['detect']:
+      if is_detect_mode():
          detect_elements(week, f'{level_workdir}/detected')
       if len(week.days) and len(week.hours.time_axe):  
          courses += week.gen_courses()
       else:
-         print(f"Wrong Week detected with {len(week.days)} days and {len(week.hours)} hours")
-   courses.sort(key=lambda x: x.begin)
-   if 'print' in GENERAL and GENERAL['print']:
-      print_courses(courses)
+         print(f"Wrong Week detected with {len(week.days)} days and {len(week.hours.time_axe)} hours")
    return courses
 
-def gen_calendars(courses: List[Course], level: str, ics_dir: str) -> List[str]:
-   """Generate ics callendar using generated courses 
+def gen_calendars(courses: List[Course], level: str, ics_dir: str, stamp: datetime.datetime) -> List[str]:
+   """Generate ics callendar using generated courses (files with the same content are left untouched)
 
    Args:
        courses (list): generated courses from pdf
        level (str): course level
        ics_dir (str): ics directory
+       stamp (datetime): stamp of the events (date of the pdf)
       
    Returns:
        list: list of the files names generated
@@ -170,22 +418,51 @@ def gen_calendars(courses: List[Course], level: str, ics_dir: str) -> List[str]:
    mkdir_if_not_exists(ics_dir)
    print(f"{level} : Generating Callendars")
    alt = SCHEDULES[level]['alt'] if 'alt' in SCHEDULES[level] else ''
-   calendar = EdtCalendar(courses, level, alt)
+   calendar = EdtCalendar(courses, level, alt, stamp)
    calendar.save(directory=ics_dir)
    return calendar.get_files_name()
 
-def send(files_name: List[str], ics_folder: str) -> None:
-   """Send generated ics files through ftp
+def changed_files(digests: Dict[str, str], level_workdir: str, server: str) -> List[str]:
+   """Get the files whose content changed since they were last sent to a server (every file when attribute 'FORCE' is used)
+
+   Args:
+       digests (dict): digest of the content of each file by file name
+       level_workdir (str): level working directory
+       server (str): key of the server
+
+   Returns:
+       list: names of the files to send
+   """
+   if 'force' in GENERAL and GENERAL['force']:
+      return list(digests)
+   sent = Metadata.load_sent(level_workdir, server)
+   return [f for f, d in digests.items() if sent.get(f) != d]
+
+def send(level: str, files_name: List[str], level_workdir: str, ics_folder: str, metrics: Metrics) -> None:
+   """Queue the ics files changed since they were last sent to each ftp server, they are sent in the background
+   
+   Files which failed to be sent are sent again on the next call, the upload is added to the metrics once done
 
    Args:
        level (str): course level
+       files_name (list): names of the ics files
+       level_workdir (str): level working directory
        ics_folder (str) : ics directory
+       metrics (Metrics): metrics of the stages of this level
    """
-   for session in FTP:
-      ftp = FtpHandler(session)
-      for fn in files_name:
-         ftp.send_file(fn, ics_folder)
-      ftp.close()
+   if FTP_PUBLISHER is None:
+      return
+   digests = {f: Metadata.digest(f'{ics_folder}/{f}') for f in files_name if os.path.exists(f'{ics_folder}/{f}')}
+   for server, key in enumerate(FTP_PUBLISHER.keys()):
+      changed = changed_files(digests, level_workdir, key)
+      if len(changed):
+         print(f"{level} : Sending {len(changed)} files through ftp ({len(digests) - len(changed)} unchanged)")
+         def done(paths: List[str], wall: float, cpu: float, key: str = key) -> None:
+            Metadata.save_sent(level_workdir, key, {os.path.basename(p): digests[os.path.basename(p)] for p in paths})
+            metrics.add('upload', wall, cpu, items=len(paths))
+            if METRICS is not None:
+               METRICS.write()
+         FTP_PUBLISHER.publish(server, [f'{ics_folder}/{f}' for f in changed], done)
 
 def detect_elements(week: Week, detect_folder: str) -> None:
    """Save detected elements on each week 
@@ -209,6 +486,27 @@ def detect_words(page: Page, detect_folder: str) -> None:
    page.frame_elements()
    page.save(detect_folder)
 
+def is_detect_mode() -> bool:
+   """Check if detected elements should be saved
+
+   Returns:
+       bool: True if the detect mode is enabled, False otherwise
+   """
+   return 'detect' in GENERAL and GENERAL['detect']
+
+def get_dpi(level: str) -> int:
+   """Get the resolution used to render the pages of a level ('DPI' of the schedule, or of the general parametters, default to 200)
+
+   Args:
+       level (str): level given by the user
+
+   Returns:
+       int: resolution of page images
+   """
+   if level in SCHEDULES and 'dpi' in SCHEDULES[level]:
+      return int(SCHEDULES[level]['dpi'])
+   return int(GENERAL['dpi']) if 'dpi' in GENERAL else Pdf.DPI
+
 def print_courses(courses: List[Course]) -> None:
    """Print generated courses 
 
@@ -218,6 +516,60 @@ def print_courses(courses: List[Course]) -> None:
    for c in courses:
       print(c)
       
+def gen_page_pool() -> PagePool:
+   """Start the pool parsing pages in parallel (with 'PAGE_WORKERS' processes, default to the number of cpu)
+
+   Returns:
+       PagePool: the started pool, None when pages should be parsed sequentially
+   """
+   workers = int(GENERAL['page_workers']) if 'page_workers' in GENERAL else os.cpu_count()
+   if workers is None or workers <= 1:
+      return None
+   return PagePool(workers)
+
+def gen_ftp_publisher() -> FtpPublisher:
+   """Start the publisher sending ics files to the ftp servers
+
+   Returns:
+       FtpPublisher: the started publisher, None when there is no ftp connexion
+   """
+   if not len(FTP):
+      return None
+   return FtpPublisher(FTP)
+
+def gen_metrics() -> MetricsExporter:
+   """Create the exporter of metrics, written in the workdir (a warning is printed for stages slower than 'STAGE_WARNING' seconds)
+
+   Returns:
+       MetricsExporter: the exporter
+   """
+   threshold = float(GENERAL['stage_warning']) if 'stage_warning' in GENERAL else None
+   return MetricsExporter(GENERAL['workdir'], threshold)
+
+def gen_page_cache() -> PageCache:
+   """Open the cache of parsed pages (in 'CACHE' folder, default to the cache folder of the workdir, limited to 'CACHE_SIZE' MB)
+   
+   Entries are signed with 'CACHE_KEY', a key of this workdir is generated when it isn't given (entries are then only read by this instance)
+
+   Returns:
+       PageCache: the opened cache, None when it's disabled (size of 0)
+   """
+   size = int(GENERAL['cache_size']) if 'cache_size' in GENERAL else 256
+   if size <= 0:
+      return None
+   folder = GENERAL['cache'] if 'cache' in GENERAL else f"{GENERAL['workdir']}/cache"
+   if 'cache_key' in GENERAL:
+      key = str(GENERAL['cache_key']).encode()
+   else:
+      mkdir_if_not_exists(GENERAL['workdir'])
+      path = f"{GENERAL['workdir']}/cache.key"
+      if not os.path.exists(path):
+         with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as file:
+            file.write(os.urandom(32))
+      with open(path, 'rb') as file:
+         key = file.read()
+   return PageCache(folder, size * 1024 * 1024, key)
+
 def mkdir_if_not_exists(folder: str) -> None:
    """Create a folder if it doesn't exists
 
@@ -226,7 +578,7 @@ def mkdir_if_not_exists(folder: str) -> None:
    """
    if not os.path.exists(folder):
       print(f"Creating \"{folder}\" folder")
-      os.makedirs(folder)
+      os.makedirs(folder, exist_ok=True) # may be created by another level at the same time
 
 def delete_if_exists(file: str) -> None:
    """Delete a file if it exists
@@ -244,7 +596,7 @@ def main(argv : list):
    Args:
        argv (list): list of argument and values pass by the user
    """
-   global GENERAL, FTP, SCHEDULES
+   global GENERAL, FTP, SCHEDULES, PAGE_POOL, PAGE_CACHE, FTP_PUBLISHER, METRICS
    ATTR = {}
    action = None
    options, _ = getopt.getopt(argv, 'w:o:c:u:l:t:dpvh', ['workdir=','output=', 'config=', 'url=', 'level=', 'time=', 'detect', 'print', 'force', 'help',  'version'])
@@ -266,7 +618,15 @@ def main(argv : list):
    GENERAL, FTP, SCHEDULES = Environnement.get_parametters(ATTR)
    if action is None:
       action = loop_time if ('time' in GENERAL) else processing_levels
+      PAGE_POOL = gen_page_pool()
+      PAGE_CACHE = gen_page_cache()
+      FTP_PUBLISHER = gen_ftp_publisher()
+      METRICS = gen_metrics()
    action()
+   if PAGE_POOL is not None:
+      PAGE_POOL.close()
+   if FTP_PUBLISHER is not None:
+      FTP_PUBLISHER.close() # wait for queued files
    exit(0)
 
 if __name__ == "__main__":
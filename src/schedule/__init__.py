@@ -2,5 +2,6 @@ from .edtcalendar import EdtCalendar
 from .course import Course
 from .group import Group
 from .hours import Hours
+from .placement import Placement
 from .time import Time
 from .week import Week
\ No newline at end of file
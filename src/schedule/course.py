@@ -1,7 +1,7 @@
 import re
-from typing import Tuple
+from datetime import timedelta
 
-from geometry import Area, AreaList, Axe, AxeType, Range
+from geometry import Area
 
 from .group import Group
 from .time import Time
@@ -21,58 +21,26 @@ class Course:
     """Treshold in percents of yellow pixels from the course area to be considered as an exam
     """
     
-    def __init__(self, hour_axe: Axe, course_area: Area, days: AreaList, week_time: Time, yellow_percent: int) -> None:
-        """Constructor of course object
+    def __init__(self, course_area: Area, day: Area, begin: timedelta, end: timedelta, group: Group, week_time: Time, yellow_percent: int) -> None:
+        """Constructor of course object (see Placement to get the day, hours and group of a course area)
 
         Args:
-            hour_axe (Axe): hours axe with time by x position
             course_area (Area): the course area with content
-            days (AreaList): list of days area
+            day (Area): the day area of the course
+            begin (timedelta): begin hour of the course
+            end (timedelta): end hour of the course
+            group (Group): course group
             week_time (Time): time of the course week
             yellow_percent (int): percent of yellow pixel from the course area
         """
-        self.day = self.__get_day(days, course_area)
-        if self.day is not None:
-            self.begin = week_time.get_time(hour=hour_axe.closest(course_area.x1()), day=self.day.content)
-            self.end = week_time.get_time(hour=hour_axe.closest(course_area.x2()), day=self.day.content)
-            self.group = self.__get_group(day=self.day, course_area=course_area)
-            self.location = self.__get_location(course_area=course_area)
-            self.teacher = self.__get_teacher(course_area=course_area)
-            self.name = self.__get_name(course_area=course_area)
-            self.exam = yellow_percent >= self.__PERCENT_YELLOW_EXAM
-        
-    def __get_day(self, days: AreaList, course_area: Area) -> Area:
-        """Get the day area of the course
-
-        Args:
-            days (AreaList): list of days area
-            course_area (Area): course area
-
-        Returns:
-            Area: day area aligned to the course 
-        """
-        middle = course_area.center().y
-        for d in days:
-            full_day: Range = d.to_range(AxeType.ORDINATE)
-            if full_day.is_contained(middle):
-                return d
-    
-    def __get_group(self, day: Area, course_area: Area) -> Group:
-        """Get the course group
-
-        Args:
-            day (Area): the day area of the course
-            course_area (Area): the course area
-
-        Returns:
-            Group: course group
-        """
-        if abs(day.h() - course_area.h()) < abs(day.h()/2 - course_area.h()): # closest size (full or half)
-            return Group.ALL # full
-        if course_area.center().y <= day.center().y:
-            return Group.GROUP1 # top
-        else:
-            return Group.GROUP2 # down
+        self.day = day
+        self.begin = week_time.get_time(hour=begin, day=day.content)
+        self.end = week_time.get_time(hour=end, day=day.content)
+        self.group = group
+        self.location = self.__get_location(course_area=course_area)
+        self.teacher = self.__get_teacher(course_area=course_area)
+        self.name = self.__get_name(course_area=course_area)
+        self.exam = yellow_percent >= self.__PERCENT_YELLOW_EXAM
     
     def __get_location(self, course_area: Area) -> str:
         """Get the course location
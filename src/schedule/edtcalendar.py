@@ -1,6 +1,9 @@
 
+import hashlib
+import os
+from datetime import datetime
 from icalendar import Calendar, Event, vText
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Union
 
 from .group import Group
 from .course import Course
@@ -8,6 +11,8 @@ from .time import Time
 
 class EdtCalendar:
     """Class used to generate an ics
+    
+    Each event is serialized once, the files are written from the serialized events shared between calendars
     """
     
     __PERIODID = "-//Google Inc//Google Calendar 70.9054//EN" # Google for better description
@@ -18,22 +23,38 @@ class EdtCalendar:
     """Calendar verions
     """
     
-    def __init__(self, courses: List[Course], level: str, alt: str) -> None:
+    def __init__(self, courses: List[Course], level: str, alt: str, stamp: datetime = None) -> None:
         """Constructor of EdtCalendar object
+        
+        Events are serialized deterministically (same courses and stamp give the same files)
 
         Args:
             courses (List[Course]): list of courses
             level (str): level of the given courses
+            stamp (datetime, optional): stamp of every event, usually the date of the source pdf (see Pdf.timestamp). Defaults to the current date.
         """
         self.level = level
+        self.stamp = stamp if stamp is not None else Time.today()
+        self.__uids: Dict[str, int] = {}
         self.alt = alt if alt else level
         self.name = {Group.ALL:f'{level}A', Group.GROUP1:f'{level}G1', Group.GROUP2:f'{level}G2', 'Exam':f'{level}E', 'Full':f'{level}', 'FullG1':f'{self.alt}_GROUPE1', 'FullG2':f'{self.alt}_GROUPE2'}
-        self.calendar = {Group.ALL:Calendar(), Group.GROUP1:Calendar(), Group.GROUP2:Calendar(), 'Exam':Calendar(), 'Full':Calendar(), 'FullG1':Calendar(), 'FullG2':Calendar()}
-        for c in self.calendar:
-            self.calendar[c].add('prodid', self.__PERIODID)
-            self.calendar[c].add('version', self.__VERSION)
+        self.events: Dict[Union[Group, str], List[bytes]] = {c: [] for c in self.name}
+        self.__header, self.__footer = self.__frame()
         self.__gen_ics(courses)
     
+    def __frame(self) -> Tuple[bytes, bytes]:
+        """Serialize the calendar properties, written before and after the events of each calendar
+
+        Returns:
+            Tuple[bytes, bytes]: serialized calendar before and after its events
+        """
+        calendar = Calendar()
+        calendar.add('prodid', self.__PERIODID)
+        calendar.add('version', self.__VERSION)
+        end = b'END:VCALENDAR'
+        header, footer = calendar.to_ical().rsplit(end, 1)
+        return header, end + footer
+    
     def __gen_ics(self, courses: List[Course]) -> None:
         """Generate ics(s) for the whole class, groups and exams
         
@@ -41,17 +62,13 @@ class EdtCalendar:
             courses (List[Course]): list of courses
         """
         for c in courses:
-            if c.exam:
-                call: Calendar = self.calendar['Exam']
-            else:
-                call: Calendar = self.calendar[c.group]
-            event = self.__gen_event(course=c)
-            call.add_component(event)
+            event = self.__gen_event(course=c).to_ical()
+            self.events['Exam' if c.exam else c.group].append(event)
             if c.group != Group.GROUP2:
-                self.calendar['FullG1'].add_component(event)
+                self.events['FullG1'].append(event)
             if c.group != Group.GROUP1:
-                self.calendar['FullG2'].add_component(event)
-            self.calendar['Full'].add_component(event)
+                self.events['FullG2'].append(event)
+            self.events['Full'].append(event)
     
     def __gen_event(self, course: Course) -> Event:
         """Generate an event from a given course
@@ -66,7 +83,8 @@ class EdtCalendar:
         event.add('summary',course.name)
         event.add('dtstart',course.begin)
         event.add('dtend', course.end)
-        event.add('dtstamp', Time.today())
+        event.add('uid', self.__uid(course=course))
+        event.add('dtstamp', self.stamp)
         event.add('location', vText(course.location))
         if course.teacher != '':
             v,p = self.__person(name=course.teacher, mail=course.teacher, role='CHAIR', status='ACCEPTED', group=False)
@@ -75,7 +93,26 @@ class EdtCalendar:
         event.add('attendee', value=v, parameters=p, encode=1)
         event.add('description',self.__description(course.teacher, str(course.group), 'Examen' if course.exam else ''))
         return event
+    
+    def __uid(self, course: Course) -> str:
+        """Get an unique identifier of an event, derived from the course content
         
+        A course keeps its identifier between runs as long as it doesn't change, 
+        identical courses of a level are numbered in their order
+
+        Args:
+            course (Course): course of the event
+
+        Returns:
+            str: event identifier
+        """
+        content = '|'.join([str(course.begin), str(course.end), course.name, course.location, course.teacher, str(course.group), str(course.exam)])
+        uid = hashlib.sha256(content.encode()).hexdigest()[:32]
+        occurrence = self.__uids.get(uid, 0)
+        self.__uids[uid] = occurrence + 1
+        if occurrence:
+            uid = f'{uid}-{occurrence}'
+        return f'{uid}@{self.level}'
     
     def __person(self, name:str, mail: str, role: str, status: str, group: bool) ->Tuple[str,dict]:
         """Format a ics person element
@@ -105,16 +142,43 @@ class EdtCalendar:
         """
         return '<br>'.join([x for x in [teacher, group, exam] if x is not None and x != ''])
 
-    def save(self, directory: str) -> None:
-        """Save each event on a file
+    def save(self, directory: str) -> List[str]:
+        """Save each event on a file, files with the same content than the new one aren't written again
 
         Args:
             directory (str): folder where the files should be generated
+
+        Returns:
+            List[str]: names of the written files (unchanged files are excluded)
         """
+        written = []
         for g, n in self.name.items():
+            path = f'{directory}/{n}.ics'
+            parts = [self.__header, *self.events[g], self.__footer]
+            if self.__same(path=path, parts=parts):
+                print(f"{self.level} : {n}.ics is unchanged")
+                continue
             print(f"{self.level} : Creating {n}.ics")
-            with open(f'{directory}/{n}.ics', 'wb') as f:
-                f.write(self.calendar[g].to_ical())
+            with open(path, 'wb') as f:
+                f.writelines(parts)
+            written.append(f'{n}.ics')
+        return written
+    
+    @staticmethod
+    def __same(path: str, parts: List[bytes]) -> bool:
+        """Check if a file has the given content (without joining it)
+
+        Args:
+            path (str): file path
+            parts (List[bytes]): parts of the content
+
+        Returns:
+            bool: True if the file exists with this content, False otherwise
+        """
+        if not os.path.exists(path) or os.path.getsize(path) != sum(len(p) for p in parts):
+            return False
+        with open(path, 'rb') as f:
+            return all(f.read(len(p)) == p for p in parts)
     
     def get_files_name(self) -> List[str]:
         """Get the ics files names
@@ -1,7 +1,9 @@
-from copy import deepcopy
+import bisect
 from datetime import timedelta
 from typing import List
 
+import numpy as np
+
 from files import Image
 from geometry import Area, AreaList, Axe, AxeType, Point, Range
 
@@ -18,8 +20,8 @@ class Hours:
         if len(words_hours):
             hour_area = Area(Point(margin.a, words_hours.first().y1()), Point(margin.b, words_hours.first().y2()))
             image = week_image.sub(hour_area)
-            upper_words_hours = deepcopy(words_hours)
-            upper_words_id = deepcopy(words_id)
+            upper_words_hours = words_hours.copy()
+            upper_words_id = words_id.copy()
             upper_words_hours.change_origin(hour_area.p1)
             upper_words_id.change_origin(hour_area.p1)
             for wd in upper_words_hours:
@@ -29,18 +31,15 @@ class Hours:
         return image
             
     def __detect_time_scale(self) -> List[int]:
-        lines = []
-        if self.image is not None:
-            one_d = self.image.one_dimension(True)
-            i = 0
-            while i < len(one_d):
-                if one_d[i] < 150:
-                    lines.append(i)
-                    while i < len(one_d) and one_d[i] < 200 :
-                        i+=1
-                else:
-                    i+=1
-        return lines
+        if self.image is None:
+            return []
+        one_d = self.image.one_dimension(True)
+        # a line is the first very dark column (< 150) of each run of dark columns (< 200)
+        dark = (one_d < 200).astype(np.int8)
+        runs = np.cumsum(np.diff(dark, prepend=0) == 1)
+        very_dark = np.flatnonzero(one_d < 150)
+        _, firsts = np.unique(runs[very_dark], return_index=True)
+        return very_dark[firsts].tolist()
     
     def __get_hours_axe(self, words_hours: AreaList, lines: List[int], margin: Range) -> Axe:
         hour_axe = Axe()
@@ -50,10 +49,7 @@ class Hours:
             hour_axe.add(margin.a, hour)
         for wh in words_hours:
             hour = int(wh.content.replace('h',''))
-            middle = wh.center().x
-            i = -1
-            while((i + 1) < len(lines) and lines[i + 1] < middle):
-                i+=1
+            i = bisect.bisect_left(lines, wh.center().x) - 1 # last line before the middle of the word
             hour_axe.add(lines[i], hour)
         if len(words_hours):
             self.__add_last_hour(words_hours, lines, hour_axe)
@@ -80,9 +76,9 @@ class Hours:
             if len(lst) == 3:
                 lst.insert(1, int((lst[0] + lst[1])/2))
             elif len(lst) != 4 and len(lst) != 1:
-                nexts = [l for l in lines if l > lst[len(lst) - 1]]
-                if len(nexts):
-                    step = (nexts[0] - lst[0])/4
+                following = bisect.bisect_right(lines, lst[len(lst) - 1])
+                if following < len(lines):
+                    step = (lines[following] - lst[0])/4
                     lst = [int(lst[0] + i*step) for i in range(0,4)]
             for id, element in enumerate(lst):
                 time_axe.add(element, timedelta(hours=hour, minutes=15*id))
@@ -92,16 +88,10 @@ class Hours:
         matrice_hour: List[List[int]] = []
         id_key,id_line = 0,0
         while(id_key + 1 < len(list_key)):
-            matrice_hour.append([lines[id_line]])
-            id_line+=1
-            while(id_line < len(lines) and lines[id_line] < list_key[id_key + 1]):
-                matrice_hour[id_key].append(lines[id_line])
-                id_line+=1
+            end = bisect.bisect_left(lines, list_key[id_key + 1], id_line + 1) # lines are sorted
+            matrice_hour.append([lines[id_line]] + lines[id_line + 1:end])
+            id_line = end
             id_key+=1
         if id_line < len(lines):
-            matrice_hour.append([])
-        while(id_line < len(lines)):
-            matrice_hour[id_key].append(lines[id_line])
-            id_line+=1
-
+            matrice_hour.append(lines[id_line:])
         return matrice_hour    
\ No newline at end of file
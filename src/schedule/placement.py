@@ -0,0 +1,95 @@
+from datetime import timedelta
+from typing import List, Tuple
+
+import numpy as np
+
+from geometry import Area, AreaList, Axe
+
+from .group import Group
+
+
+class Placement:
+    """Class placing course frames on the time axe and the day rows of a week
+
+    Axes are turned into sorted arrays once, then every frame of the week is placed at once
+    """
+    
+    def __init__(self, time_axe: Axe, days: AreaList) -> None:
+        """Constructor of Placement
+
+        Args:
+            time_axe (Axe): time axe with hour by x position
+            days (AreaList): list of days area (with time relative to the first day of the week as content)
+        """
+        ticks = list(time_axe)
+        order = np.argsort(np.array(ticks, dtype=np.float64), kind='stable')
+        self.__ticks = np.array(ticks, dtype=np.float64)[order]
+        self.__ranks = order # insertion order of each tick, the first one wins when two ticks are as close (as Axe.closest)
+        self.__hours: List[timedelta] = [time_axe[ticks[i]] for i in order]
+        self.__days = days
+        self.__rows = days.array().coordinates[:, [1, 3]].astype(np.float64)
+    
+    def place(self, frames: AreaList) -> List[Tuple[Area, timedelta, timedelta, Group]]:
+        """Get the day, begin hour, end hour and group of each frame
+
+        Args:
+            frames (AreaList): course frames
+
+        Returns:
+            List[Tuple[Area, timedelta, timedelta, Group]]: placement of each frame, with a day of None for frames outside of every day
+        """
+        if not len(frames):
+            return []
+        coordinates = frames.array().coordinates.astype(np.float64)
+        middles = (coordinates[:, 1] + coordinates[:, 3]) / 2
+        on_day = (self.__rows[:, 0] <= middles[:, None]) & (middles[:, None] <= self.__rows[:, 1])
+        has_day = on_day.any(axis=1)
+        if not has_day.any():
+            return [(None, None, None, None)] * len(frames)
+        day_ids = on_day.argmax(axis=1) # first day (in list order) containing the middle of the frame
+        begins = self.__closest(coordinates[:, 0])
+        ends = self.__closest(coordinates[:, 2])
+        groups = self.__groups(coordinates, middles, day_ids)
+        return [(self.__days[d], self.__hours[b], self.__hours[e], g) if h else (None, None, None, None)
+                for h, d, b, e, g in zip(has_day, day_ids, begins, ends, groups)]
+    
+    def __closest(self, xs: np.ndarray) -> np.ndarray:
+        """Get the closest tick of each coordinate with a binary search
+
+        Args:
+            xs (np.ndarray): x coordinates
+
+        Raises:
+            ValueError: the time axe is empty
+
+        Returns:
+            np.ndarray: index of the closest tick (in sorted order)
+        """
+        if not len(self.__ticks):
+            raise ValueError("Can't place courses on an empty time axe")
+        last = len(self.__ticks) - 1
+        right = np.clip(np.searchsorted(self.__ticks, xs), 0, last)
+        left = np.clip(right - 1, 0, last)
+        left_distance = np.abs(xs - self.__ticks[left])
+        right_distance = np.abs(self.__ticks[right] - xs)
+        take_right = (right_distance < left_distance) | ((right_distance == left_distance) & (self.__ranks[right] < self.__ranks[left]))
+        return np.where(take_right, right, left)
+    
+    def __groups(self, coordinates: np.ndarray, middles: np.ndarray, day_ids: np.ndarray) -> List[Group]:
+        """Get the group of each frame from the size and the position of the frame within its day
+
+        Args:
+            coordinates (np.ndarray): x1, y1, x2, y2 of each frame
+            middles (np.ndarray): y center of each frame
+            day_ids (np.ndarray): day index of each frame
+
+        Returns:
+            List[Group]: group of each frame
+        """
+        rows = self.__rows[day_ids]
+        day_heights = np.abs(rows[:, 1] - rows[:, 0])
+        day_middles = (rows[:, 0] + rows[:, 1]) / 2
+        heights = np.abs(coordinates[:, 3] - coordinates[:, 1])
+        full = np.abs(day_heights - heights) < np.abs(day_heights/2 - heights) # closest size (full or half)
+        top = middles <= day_middles
+        return [Group.ALL if f else (Group.GROUP1 if t else Group.GROUP2) for f, t in zip(full, top)]
\ No newline at end of file
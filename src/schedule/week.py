@@ -1,46 +1,41 @@
 import re
 from datetime import timedelta
-from typing import List, Tuple
+from typing import Callable, List, Tuple
 
 from files import Image
-from geometry import Area, AreaList, AxeType, Point, Range
+from geometry import Area, AreaIndex, AreaList, AxeType, Point, Range
 from utils import Color
 
 from .course import Course
 from .hours import Hours
+from .placement import Placement
 from .time import Time
 
 
 class Week:
-    __RANGE_CLASS = Range(80,1000,AxeType.ABSCISSA)
+    __RANGE_CLASS = Range(0.4,5,AxeType.ABSCISSA) # width of a class frame in inches
     REGEX_WEEK_ID = re.compile(r'^[Ss]?((\d)|([0-4]\d)|(5[0-3]))$')
     def __init__(self, image: Image , words: AreaList, times: List[Time], weeks: List['Week']) -> None:
         self.image = image
         self.words = words
-        self.frames = self.image.find_contours(True, True, self.__RANGE_CLASS)
-        words_days = self.words.match(Time.REGEX_DAY, remove=True)
+        self.frames = self.image.find_contours(True, True, self.__RANGE_CLASS.scale(self.image.dpi))
+        words_days, words_id, words_hours = self.words.partition([Time.REGEX_DAY, self.REGEX_WEEK_ID, Time.REGEX_HOUR])
         if not len(words_days) or not len(times):
             return
-        words_id = self.words.match(pattern=self.REGEX_WEEK_ID, remove=True)
         self.__resize_words(self.frames, words_days, words_id)
         if self.__detect_multiple_weeks(words_days):
             y1, y2 = self.__get_separation_point_weeks(words_days, words_id)
-            self.__cut_weeks(y1, y2, words_days, words_id, times, weeks)
+            self.__cut_weeks(y1, y2, words_days, words_id, words_hours, times, weeks)
         else:
             self.time = times[0]
-        words_hours = self.words.match(pattern=Time.REGEX_HOUR, remove=True)
         self.hours = Hours(words_hours, words_id, image.area.to_range(AxeType.ABSCISSA), self.image)
         self.days = self.__get_day(words_days)
         self.id = self.__get_id(words_id)
         self.classes = self.__get_classes(self.frames)
     
     def __detect_multiple_weeks(self, words_days: AreaList) -> bool:
-        duplicate = False
-        for wd1 in words_days:
-            for wd2 in words_days:
-                if wd1 != wd2 and wd1.content == wd2.content:
-                     duplicate = True
-        return duplicate
+        # a day found twice means two weeks share this frame
+        return len({wd.content for wd in words_days}) < len(words_days)
     
     def __get_separation_point_weeks(self, words_days: AreaList, words_id: AreaList) -> Tuple[int,int]:
         words_days.sort(key=lambda wd: wd.p1.y)
@@ -52,29 +47,35 @@ class Week:
             return words_days[days_id].p2.y, words_id[1].p1.y
         return words_days[days_id].p2.y, words_days[days_id + 1].p1.y
 
-    def __cut_weeks(self, y1: int, y2: int, words_days: AreaList, words_id: AreaList,  times: List[Time], weeks: List['Week']):
+    def __cut_weeks(self, y1: int, y2: int, words_days: AreaList, words_id: AreaList, words_hours: AreaList, times: List[Time], weeks: List['Week']):
         area_week1 = Area(self.image.area.p1, Point(self.image.area.p2.x,y1))
         area_week2 = Area(Point(self.image.area.p1.x, y2), self.image.area.p2)
         times.sort(key=lambda t: t.value)
         self.time = times[0]
         times_week2 = times[1:]
-        image_week2 = self.image.sub(area_week2, copy_img=True)
-        self.image = self.image.sub(area_week1, copy_img=True)
+        image_week2 = self.image.sub(area_week2)
+        self.image = self.image.sub(area_week1)
         words_week2 = self.words.contained(area_week2, remove=True)
         words_week2 += words_days.contained(area_week2, remove=True)
         words_week2 += words_id.contained(area_week2, remove=True)
+        words_week2 += words_hours.contained(area_week2, remove=True)
         words_week2.change_origin(area_week2.p1)
         weeks.append(Week(image_week2, words_week2, times_week2, weeks))
     
     def __resize_words(self, frames: AreaList, words_days: AreaList, words_id: AreaList) -> None:
+        index = frames.index()
         for day in words_days:
-            for frame in frames:
-                if frame.in_bound(day.center()) and day.h() < frame.h():
-                    day.resize(frame)
+            self.__resize_word(day, frames, index, lambda a: a.h())
         for id in words_id:
-            for frame in frames:
-                if frame.in_bound(id.center()) and id.w() < frame.w():
-                    id.resize(frame)
+            self.__resize_word(id, frames, index, lambda a: a.w())
+    
+    def __resize_word(self, word: Area, frames: AreaList, index: AreaIndex, size: Callable[[Area], int]) -> None:
+        # resize the word to each following frame bounding its center and bigger than it (as a scan of frames in order would)
+        i = -1
+        while i is not None:
+            i = next((f for f in index.bounding(word.center()) if f > i and size(word) < size(frames[f])), None)
+            if i is not None:
+                word.resize(frames[i])
         
     def __get_day(self, words_days: AreaList) -> AreaList:
         for day in words_days:
@@ -91,32 +92,35 @@ class Week:
         classes = AreaList()
         self.__remove_overlapping(frames)
         self.words.sort(key=lambda a: a.p1.y)
+        index = self.words.index()
         for frame in frames:
-            frame.content = [] # add words to each class frame
-            for word in self.words: 
-                if frame.in_bound(word.center()):
-                    frame.content.append(word.content)
+            frame.content = [self.words[i].content for i in index.centers_in(frame)] # add words to each class frame
             if len(frame.content) != 0: # remove frame without content
                 classes.append(frame)
         return classes
 
     def __remove_overlapping(self, classes: AreaList) -> None:
-        overlapping = []
-        for c1 in classes: # remove overlapping frames
-            for c2 in classes:
-                if c1 != c2 and c1.contain(c2):
-                    overlapping.append(c2)
-        for o in overlapping:
-                classes.remove(o)
+        # remove frames contained by an other one, which must bound the center of the contained frame
+        index = classes.index()
+        overlapping = set()
+        for i, c in enumerate(classes):
+            if any(j != i and classes[j].contain(c) for j in index.bounding(c.center())):
+                overlapping.add(i)
+        classes[:] = [c for i, c in enumerate(classes) if i not in overlapping]
+    
+    def release_image(self) -> None:
+        # exam colors are measured before the images are released (weeks sent back by page workers carry no pixels)
+        self.yellow_percents = self.image.percent_colors(self.classes, Color.YELLOW, False)
+        self.image = None
+        self.hours.image = None
     
     def gen_courses(self) -> List[Course]:
         courses = []
-        for c in self.classes:
-            sub_img = self.image.sub(c, False)
-            yellow_percent = sub_img.percent_color(Color.YELLOW, False)
-            course = Course(self.hours.time_axe, c, self.days, self.time, yellow_percent)
-            if course.day is not None:
-                courses.append(course)
+        placements = Placement(self.hours.time_axe, self.days).place(self.classes)
+        yellow_percents = self.yellow_percents if self.image is None else self.image.percent_colors(self.classes, Color.YELLOW, False)
+        for c, (day, begin, end, group), yellow_percent in zip(self.classes, placements, yellow_percents):
+            if day is not None:
+                courses.append(Course(c, day, begin, end, group, self.time, yellow_percent))
         return courses
         
     def frame_words(self) -> None:
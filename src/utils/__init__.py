@@ -1,3 +1,7 @@
+from .budget import MemoryBudget
 from .color import Color
 from .environnement import Environnement
-from .ftphandler import FtpHandler
\ No newline at end of file
+from .ftphandler import FtpHandler
+from .ftppublisher import FtpPublisher
+from .metrics import Metrics, MetricsExporter
+from .scheduler import PollingPolicy, Scheduler
\ No newline at end of file
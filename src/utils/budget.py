@@ -0,0 +1,54 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class MemoryBudget:
+    """Class sharing a memory budget between threads
+    """
+    
+    def __init__(self, limit: int = None) -> None:
+        """Constructor of MemoryBudget
+
+        Args:
+            limit (int, optional): budget in bytes, no limit when None. Defaults to None.
+        """
+        self.limit = limit
+        self.used = 0
+        self.__condition = threading.Condition()
+    
+    def acquire(self, size: int) -> None:
+        """Wait until the given size fits in the budget then take it
+        
+        A reservation is always granted when nothing else is reserved, so a document larger than the budget is still processed (alone)
+
+        Args:
+            size (int): size in bytes
+        """
+        with self.__condition:
+            while self.limit is not None and self.used > 0 and self.used + size > self.limit:
+                self.__condition.wait()
+            self.used += size
+    
+    def release(self, size: int) -> None:
+        """Give back a size taken from the budget
+
+        Args:
+            size (int): size in bytes
+        """
+        with self.__condition:
+            self.used -= size
+            self.__condition.notify_all()
+    
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[None]:
+        """Take a size from the budget for the duration of a with block
+
+        Args:
+            size (int): size in bytes
+        """
+        self.acquire(size)
+        try:
+            yield
+        finally:
+            self.release(size)
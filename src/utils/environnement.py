@@ -14,7 +14,7 @@ class Environnement:
    VALIDATION_CONFIG_FILE = "schema/config.json"
    """File where schema are stored
    """
-   VARIABLES = ['level', 'detect', 'print', 'workdir', 'output', 'force', 'time']
+   VARIABLES = ['level', 'detect', 'print', 'workdir', 'output', 'force', 'time', 'page_workers', 'level_workers', 'memory_budget', 'cache', 'cache_size', 'cache_key', 'words', 'dpi', 'stage_warning']
    """list of used environnement variables
    """
 
@@ -1,42 +1,74 @@
 import os
 import ssl
-from ftplib import FTP, FTP_TLS
+from ftplib import FTP, FTP_TLS, error_perm
 
 
 class FtpHandler:
     """Class handling ftp operations
     """
+    PART_SUFFIX = '.part'
+    """Suffix of files being uploaded (renamed once complete)
+    """
+    
     def __init__(self, config: dict):
         """Creation of ftp handler
 
         Args:
-            config (dict): ftp parametters 
+            config (dict): ftp parametters
         """
         if 'ssl' in config and config['ssl']:
             context = ssl.create_default_context()
             self.conn = FTP_TLS(context=context)
         else:
             self.conn = FTP()
-        self.conn.connect(host=config['host'], port=config['port'])
+        self.conn.connect(host=config['host'], port=config['port'] if 'port' in config else 21)
         self.conn.login(user=config['user'], passwd=config['password'])
         self.conn.voidcmd("NOOP")
         if 'folder' in config:
             self.conn.cwd(config['folder'])
     
-    def send_file(self, file_name: str, src_folder: str ="/") -> None:
+    @staticmethod
+    def key(config: dict) -> str:
+        """Get a key identifying the destination of a connexion
+
+        Args:
+            config (dict): ftp parametters
+
+        Returns:
+            str: user, host, port and folder of the connexion
+        """
+        port = config['port'] if 'port' in config else 21
+        folder = config['folder'] if 'folder' in config else '/'
+        return f"{config['user']}@{config['host']}:{port}{folder}"
+    
+    def send_file(self, path: str, name: str = None) -> None:
         """Send a file to the ftp server
 
+        The file is uploaded under a temporary name then renamed, so readers never get a partial file
+
         Args:
-            file_name (str): file that should be sent
-            src_folder (str, optional): folder in which file sould be sent. Defaults to "/".
+            path (str): path of the local file
+            name (str, optional): name of the file on the server. Defaults to the local file name.
         """
-        dir_local = os.getcwd()
-        os.chdir(src_folder)
-        with open(file_name, 'rb') as fp:
-            self.conn.storbinary('STOR ' + fp.name, fp)
-        os.chdir(dir_local)
+        name = os.path.basename(path) if name is None else name
+        part = f'{name}{self.PART_SUFFIX}'
+        with open(path, 'rb') as fp:
+            self.conn.storbinary(f'STOR {part}', fp)
+        try:
+            self.conn.rename(part, name)
+        except error_perm: # some servers don't replace an existing file
+            self.conn.delete(name)
+            self.conn.rename(part, name)
+    
+    def noop(self) -> None:
+        """Keep the connexion alive (raise an ftp error if it's lost)
+        """
+        self.conn.voidcmd("NOOP")
     
     def close(self):
         """Close ftp connexion
         """
-        self.conn.quit()
\ No newline at end of file
+        try:
+            self.conn.quit()
+        except Exception: # connexion already lost
+            self.conn.close()
\ No newline at end of file
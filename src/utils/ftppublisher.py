@@ -0,0 +1,146 @@
+import ftplib
+import queue
+import threading
+import time
+from typing import Callable, List, Set, Tuple
+
+from .ftphandler import FtpHandler
+
+
+class FtpPublisher:
+    """Class sending files to ftp servers in the background
+
+    Each server has its own thread and connexion, the connexion is kept alive between uploads (NOOP when idle) and opened again when lost,
+    uploads to different servers run at the same time and the caller never waits on the network
+    """
+    KEEPALIVE = 60
+    """Delay (in seconds) between two NOOP commands on an idle connexion
+    """
+    
+    def __init__(self, sessions: List[dict]) -> None:
+        """Constructor of FtpPublisher, start a thread for each server
+
+        Args:
+            sessions (List[dict]): ftp parametters of each server
+        """
+        self.sessions = sessions
+        self.__queues: List[queue.Queue] = [queue.Queue() for _ in sessions]
+        self.__pending: Set[Tuple[int, str]] = set()
+        self.__lock = threading.Lock()
+        self.__threads = [threading.Thread(target=self.__run, args=(server,), daemon=True) for server in range(len(sessions))]
+        for thread in self.__threads:
+            thread.start()
+    
+    def keys(self) -> List[str]:
+        """Get the key of each server (see FtpHandler.key)
+
+        Returns:
+            List[str]: key of each server, by server index
+        """
+        return [FtpHandler.key(session) for session in self.sessions]
+    
+    def publish(self, server: int, paths: List[str], done: Callable[[List[str], float, float], None] = None) -> None:
+        """Queue files to send to a server (files already waiting to be sent to this server are skipped)
+
+        Args:
+            server (int): index of the server
+            paths (List[str]): paths of the local files
+            done (Callable[[List[str], float, float], None], optional): called with the queued paths, the wall and cpu time of the upload once they are all sent (from the thread of the server). Defaults to None.
+        """
+        with self.__lock:
+            paths = [p for p in paths if (server, p) not in self.__pending]
+            self.__pending.update((server, p) for p in paths)
+        if len(paths):
+            self.__queues[server].put((paths, done))
+    
+    def join(self) -> None:
+        """Wait until every queued file is sent (or failed)
+        """
+        for files in self.__queues:
+            files.join()
+    
+    def close(self) -> None:
+        """Send the queued files then close the connexions and stop the threads
+        """
+        for files in self.__queues:
+            files.put(None)
+        for thread in self.__threads:
+            thread.join()
+    
+    def __run(self, server: int) -> None:
+        """Send the files queued for a server (thread of the server)
+
+        Args:
+            server (int): index of the server
+        """
+        handler: FtpHandler = None
+        while True:
+            try:
+                job = self.__queues[server].get(timeout=self.KEEPALIVE)
+            except queue.Empty:
+                handler = self.__keep_alive(handler)
+                continue
+            try:
+                if job is None:
+                    break
+                paths, done = job
+                wall, cpu = time.perf_counter(), time.thread_time()
+                handler, sent = self.__send(server, handler, paths)
+                wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+                with self.__lock:
+                    self.__pending.difference_update((server, p) for p in paths)
+                if sent and done is not None:
+                    try:
+                        done(paths, wall, cpu)
+                    except Exception as e: # the thread keeps sending the next files
+                        print(f"{self.sessions[server]['host']} : Error after sending {len(paths)} files ({e})")
+            finally:
+                self.__queues[server].task_done()
+        if handler is not None:
+            handler.close()
+    
+    def __send(self, server: int, handler: FtpHandler, paths: List[str]) -> Tuple[FtpHandler, bool]:
+        """Send files through the connexion of a server, the connexion is opened again once when it fails
+
+        Args:
+            server (int): index of the server
+            handler (FtpHandler): opened connexion, None if there is none
+            paths (List[str]): paths of the local files
+
+        Returns:
+            Tuple[FtpHandler, bool]: connexion (None if lost) and True if every file was sent
+        """
+        error = None
+        for _ in range(2):
+            try:
+                if handler is None:
+                    handler = FtpHandler(self.sessions[server])
+                for path in paths:
+                    handler.send_file(path)
+                return handler, True
+            except ftplib.all_errors as e:
+                error = e
+                if handler is not None:
+                    handler.close()
+                handler = None
+        print(f"{self.sessions[server]['host']} : Connexion error, {len(paths)} files not sent ({error})")
+        return None, False
+    
+    @staticmethod
+    def __keep_alive(handler: FtpHandler) -> FtpHandler:
+        """Keep an idle connexion alive
+
+        Args:
+            handler (FtpHandler): opened connexion, None if there is none
+
+        Returns:
+            FtpHandler: the connexion, None if it's lost
+        """
+        if handler is None:
+            return None
+        try:
+            handler.noop()
+            return handler
+        except ftplib.all_errors:
+            handler.close()
+            return None
\ No newline at end of file
@@ -0,0 +1,257 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+def rss() -> int:
+    """Get the resident memory of this process
+
+    Returns:
+        int: resident memory in bytes (maximum since start when the current one is unknown)
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+
+class Metrics:
+    """Metrics of the stages of a level during a cycle: wall time, cpu time (of the thread running the stage), peak memory and items
+
+    Memory is the resident memory of the process, sampled while a stage runs (levels processed at the same time share it)
+    """
+    STAGES = ['fetch', 'rasterize', 'words', 'pages', 'weeks', 'courses', 'calendars', 'upload']
+    """Stages of the pipeline
+    """
+    __INTERVAL = 0.05
+    """Delay (in seconds) between two memory samples
+    """
+    __RUNNING: Dict[int, dict] = {}
+    """Stages running in this process (by identity of their record)
+    """
+    __LOCK = threading.Lock()
+    """Lock of running stages and records
+    """
+    __SAMPLER: threading.Thread = None
+    """Thread sampling memory
+    """
+    __ACTIVE = threading.Event()
+    """Set while stages are running (the sampler waits for it otherwise)
+    """
+    
+    def __init__(self, level: str, cycle: int = 0, threshold: float = None) -> None:
+        """Constructor of Metrics
+
+        Args:
+            level (str): level given by the user
+            cycle (int, optional): number of the cycle. Defaults to 0.
+            threshold (float, optional): wall time (in seconds) of a stage above which a warning is printed. Defaults to None (no warning).
+        """
+        self.level = level
+        self.cycle = cycle
+        self.threshold = threshold
+        self.status = 'running'
+        self.start = time.time()
+        self.end: float = None
+        self.stages: Dict[str, dict] = {}
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """Measure a stage for the duration of a with block (a stage measured several times is summed)
+
+        Args:
+            name (str): name of the stage
+
+        Yields:
+            dict: record of the stage, its 'items' can be set within the block
+        """
+        running = {'peak_rss': rss(), 'items': None}
+        with Metrics.__LOCK:
+            Metrics.__RUNNING[id(running)] = running
+            Metrics.__ACTIVE.set()
+            if Metrics.__SAMPLER is None:
+                Metrics.__SAMPLER = threading.Thread(target=Metrics.__sample, daemon=True)
+                Metrics.__SAMPLER.start()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield running
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            memory = rss()
+            with Metrics.__LOCK:
+                del Metrics.__RUNNING[id(running)]
+            self.add(name, wall, cpu, max(running['peak_rss'], memory), running['items'])
+    
+    def add(self, name: str, wall: float, cpu: float, peak_rss: int = None, items: int = None) -> None:
+        """Add a measure to a stage (measured elsewhere, by a worker process or an upload thread)
+
+        Args:
+            name (str): name of the stage
+            wall (float): wall time in seconds
+            cpu (float): cpu time in seconds
+            peak_rss (int, optional): peak resident memory in bytes. Defaults to None (unknown).
+            items (int, optional): number of items processed by the stage. Defaults to None (not counted).
+        """
+        with Metrics.__LOCK:
+            record = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'peak_rss': None, 'items': None})
+            record['wall'] += wall
+            record['cpu'] += cpu
+            if peak_rss is not None:
+                record['peak_rss'] = max(record['peak_rss'] or 0, peak_rss)
+            if items is not None:
+                record['items'] = (record['items'] or 0) + items
+    
+    def finish(self, status: str) -> None:
+        """End the cycle of the level, a warning is printed for each stage slower than the threshold
+
+        Args:
+            status (str): result of the cycle (parsed, skipped or error)
+        """
+        self.status = status
+        self.end = time.time()
+        for name, record in self.to_dict()['stages'].items():
+            if self.threshold is not None and record['wall'] > self.threshold:
+                print(f"{self.level} : Warning, stage {name} took {record['wall']:.1f} sec (more than {self.threshold} sec)", file=sys.stderr)
+    
+    def to_dict(self) -> dict:
+        """Get the metrics as a dictionnary
+
+        Returns:
+            dict: cycle, status, start and end timestamps, and measures by stage
+        """
+        with Metrics.__LOCK:
+            stages = {n: dict(s) for n, s in self.stages.items()}
+        return {'cycle': self.cycle, 'status': self.status, 'start': self.start, 'end': self.end, 'stages': stages}
+    
+    @staticmethod
+    def __sample() -> None:
+        """Sample memory for the running stages (sampler thread), memory isn't read while no stage is running
+        """
+        while True:
+            Metrics.__ACTIVE.wait()
+            memory = rss()
+            with Metrics.__LOCK:
+                for running in Metrics.__RUNNING.values():
+                    running['peak_rss'] = max(running['peak_rss'], memory)
+                if not len(Metrics.__RUNNING):
+                    Metrics.__ACTIVE.clear()
+            time.sleep(Metrics.__INTERVAL)
+
+
+class MetricsExporter:
+    """Keep the metrics of the last cycles of each level and write them into a Prometheus textfile and a JSON status file
+
+    Files are replaced atomically, so they can be read (by the node exporter textfile collector) at any time
+    """
+    PROMETHEUS_NAME = 'metrics.prom'
+    """Name of the Prometheus textfile
+    """
+    STATUS_NAME = 'status.json'
+    """Name of the JSON status file
+    """
+    HISTORY = 10
+    """Number of cycles kept by level in the JSON status file
+    """
+    __PREFIX = 'metronome'
+    """Prefix of Prometheus metrics
+    """
+    
+    def __init__(self, directory: str, threshold: float = None) -> None:
+        """Constructor of MetricsExporter
+
+        Args:
+            directory (str): directory where files are written
+            threshold (float, optional): wall time (in seconds) of a stage above which a warning is printed. Defaults to None (no warning).
+        """
+        self.directory = directory
+        self.threshold = threshold
+        self.cycles: Dict[str, int] = {}
+        self.levels: Dict[str, List[Metrics]] = {}
+        self.__lock = threading.Lock()
+    
+    def level(self, level: str) -> Metrics:
+        """Start a new cycle of a level (a run of the level, levels polled on their own intervals have their own cycles)
+
+        Args:
+            level (str): level given by the user
+
+        Returns:
+            Metrics: metrics of the level during this cycle
+        """
+        with self.__lock:
+            self.cycles[level] = self.cycles.get(level, 0) + 1
+            metrics = Metrics(level, self.cycles[level], self.threshold)
+            history = self.levels.setdefault(level, [])
+            history.append(metrics)
+            del history[:-self.HISTORY]
+        return metrics
+    
+    def write(self) -> None:
+        """Write the Prometheus textfile and the JSON status file
+        """
+        with self.__lock:
+            levels = {level: [m.to_dict() for m in history] for level, history in self.levels.items()}
+            self.__replace(self.STATUS_NAME, json.dumps({'cycles': dict(self.cycles), 'levels': levels}, indent=4))
+            self.__replace(self.PROMETHEUS_NAME, self.__prometheus(levels))
+    
+    def __prometheus(self, levels: Dict[str, List[dict]]) -> str:
+        """Format the last cycle of each level in the Prometheus text format
+
+        Args:
+            levels (Dict[str, List[dict]]): cycles of each level
+
+        Returns:
+            str: content of the textfile
+        """
+        metrics = {
+            'stage_seconds': ('gauge', 'Wall time of each stage during the last cycle', 'wall'),
+            'stage_cpu_seconds': ('gauge', 'Cpu time of each stage during the last cycle', 'cpu'),
+            'stage_peak_rss_bytes': ('gauge', 'Peak resident memory of the process during each stage of the last cycle', 'peak_rss'),
+            'stage_items': ('gauge', 'Items processed by each stage during the last cycle (pages, weeks, courses, files)', 'items'),
+        }
+        lines = []
+        for name, (kind, description, key) in metrics.items():
+            lines += [f'# HELP {self.__PREFIX}_{name} {description}', f'# TYPE {self.__PREFIX}_{name} {kind}']
+            for level, history in levels.items():
+                for stage, record in history[-1]['stages'].items():
+                    if record[key] is not None:
+                        lines.append(f'{self.__PREFIX}_{name}{{level="{self.__label(level)}",stage="{self.__label(stage)}"}} {record[key]}')
+        lines += [f'# HELP {self.__PREFIX}_cycle Number of the last cycle (run) of each level', f'# TYPE {self.__PREFIX}_cycle gauge']
+        lines += [f'{self.__PREFIX}_cycle{{level="{self.__label(level)}"}} {history[-1]["cycle"]}' for level, history in levels.items()]
+        lines += [f'# HELP {self.__PREFIX}_cycle_success Whether the last cycle of each level ended without error', f'# TYPE {self.__PREFIX}_cycle_success gauge']
+        lines += [f'{self.__PREFIX}_cycle_success{{level="{self.__label(level)}"}} {int(history[-1]["status"] != "error")}' for level, history in levels.items()]
+        lines += [f'# HELP {self.__PREFIX}_cycle_end_timestamp_seconds End of the last cycle of each level', f'# TYPE {self.__PREFIX}_cycle_end_timestamp_seconds gauge']
+        lines += [f'{self.__PREFIX}_cycle_end_timestamp_seconds{{level="{self.__label(level)}"}} {history[-1]["end"]}' for level, history in levels.items() if history[-1]['end'] is not None]
+        return '\n'.join(lines) + '\n'
+    
+    @staticmethod
+    def __label(value: str) -> str:
+        """Escape a label value of the Prometheus text format (backslash, double quote and line feed)
+
+        Args:
+            value (str): label value
+
+        Returns:
+            str: escaped value
+        """
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def __replace(self, name: str, content: str) -> None:
+        """Replace a file atomically
+
+        Args:
+            name (str): file name
+            content (str): file content
+        """
+        path = f'{self.directory}/{name}'
+        temp = f'{path}.{os.getpid()}.tmp'
+        with open(temp, 'w') as file:
+            file.write(content)
+        os.replace(src=temp, dst=path)
\ No newline at end of file
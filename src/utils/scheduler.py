@@ -0,0 +1,130 @@
+import asyncio
+import datetime
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+
+class PollingPolicy:
+    """Polling interval of a schedule: base interval (which can depend on the time of day), random jitter and back off while the source doesn't change
+    """
+    BACKOFF = 2
+    """Factor applied to the interval after each run without change
+    """
+    MAX_BACKOFF = 4
+    """Default maximum factor of the base interval reached by backing off
+    """
+    
+    def __init__(self, config: dict, interval: float) -> None:
+        """Constructor of PollingPolicy
+
+        Args:
+            config (dict): schedule parametters ('interval', 'jitter', 'backoff' and 'periods' are optional)
+            interval (float): interval (in seconds) used when the schedule doesn't set one
+        """
+        self.interval = float(config['interval']) if 'interval' in config else float(interval)
+        self.jitter = float(config['jitter']) if 'jitter' in config else 0.0
+        self.backoff = float(config['backoff']) if 'backoff' in config else float(self.MAX_BACKOFF)
+        self.periods: List[Tuple[datetime.time, datetime.time, float]] = []
+        for period in config['periods'] if 'periods' in config else []:
+            start = datetime.time.fromisoformat(period['from'])
+            end = datetime.time.fromisoformat(period['to'])
+            self.periods.append((start, end, float(period['interval'])))
+        self.factor = 1.0
+    
+    def base(self, now: datetime.datetime) -> float:
+        """Get the base interval at a given time (the one of the first period containing it, the default one otherwise)
+
+        Args:
+            now (datetime.datetime): local time
+
+        Returns:
+            float: interval in seconds
+        """
+        moment = now.time()
+        for start, end, interval in self.periods:
+            if (start <= moment < end) if start <= end else (moment >= start or moment < end): # a period can span midnight
+                return interval
+        return self.interval
+    
+    def next(self, changed: bool, now: datetime.datetime) -> float:
+        """Get the interval until the next run: the base interval after a change, backed off after each run without change
+
+        Args:
+            changed (bool): whether the source changed during the last run
+            now (datetime.datetime): local time
+
+        Returns:
+            float: interval in seconds
+        """
+        self.factor = 1.0 if changed else min(self.factor * self.BACKOFF, max(1.0, self.backoff))
+        return self.base(now) * self.factor
+    
+    def delay(self) -> float:
+        """Get a random delay added to a run, so schedules with the same interval don't poll at the same time
+
+        Returns:
+            float: delay in seconds
+        """
+        return random.uniform(0, self.jitter) if self.jitter > 0 else 0.0
+
+
+class Scheduler:
+    """Run a job for each schedule forever, each one on its own polling policy
+    
+    An asyncio event loop waits for the deadlines while jobs run in a thread pool. The next deadline is computed from the previous one
+    (not from the end of the run), so a slow run doesn't push its following runs back, deadlines missed during a run are skipped
+    """
+    
+    def __init__(self, policies: Dict[str, PollingPolicy], workers: int) -> None:
+        """Constructor of Scheduler
+
+        Args:
+            policies (Dict[str, PollingPolicy]): polling policy by schedule
+            workers (int): number of jobs running at the same time
+        """
+        self.policies = policies
+        self.workers = workers
+    
+    def run(self, job: Callable[[str], bool]) -> None:
+        """Run the jobs forever
+
+        Args:
+            job (Callable[[str], bool]): job run with the name of a schedule, returns whether its source changed
+        """
+        asyncio.run(self.__main(job))
+    
+    async def __main(self, job: Callable[[str], bool]) -> None:
+        """Start a task for each schedule
+
+        Args:
+            job (Callable[[str], bool]): job run with the name of a schedule
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            await asyncio.gather(*(self.__schedule(name, policy, job, executor) for name, policy in self.policies.items()))
+    
+    async def __schedule(self, name: str, policy: PollingPolicy, job: Callable[[str], bool], executor: ThreadPoolExecutor) -> None:
+        """Run the job of a schedule on each of its deadlines
+
+        Args:
+            name (str): name of the schedule
+            policy (PollingPolicy): polling policy of the schedule
+            job (Callable[[str], bool]): job run with the name of the schedule
+            executor (ThreadPoolExecutor): thread pool running jobs
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            await asyncio.sleep(max(0.0, deadline + policy.delay() - loop.time()))
+            try:
+                changed = await loop.run_in_executor(executor, job, name)
+            except Exception as e: # a failed run is retried on the next deadline
+                print(f"{name} : Error, {e}")
+                changed = False
+            interval = policy.next(bool(changed), datetime.datetime.now())
+            deadline += interval
+            now = loop.time()
+            if deadline < now: # the run took longer than the interval
+                deadline += math.ceil((now - deadline) / interval) * interval if interval > 0 else now - deadline
+            print(f"{name} : Next check in {deadline - now:.0f} sec")
\ No newline at end of file
@@ -0,0 +1,401 @@
+import contextlib
+import datetime
+import getopt
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from typing import Any, Callable, Dict, List
+
+SCHEDULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedules')
+SRC_DIR = os.path.join(os.path.dirname(SCHEDULES_DIR), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from pdfminer.pdfpage import PDFPage
+
+from files import Page, Pdf
+from geometry import Area, AxeType, Point
+from schedule import Hours, Time, Week
+from utils import Color
+from utils.metrics import rss
+
+# src/parser.py is loaded by path, 'import parser' would get the standard library module on python 3.8 and 3.9
+_SPEC = importlib.util.spec_from_file_location('metronome_parser', os.path.join(SRC_DIR, 'parser.py'))
+parser = importlib.util.module_from_spec(_SPEC)
+sys.modules[_SPEC.name] = parser
+_SPEC.loader.exec_module(parser)
+
+HELP = ("This script benchmarks the parsing of the sample schedules (tests/schedules).\n"
+        "\n"
+        "Options:\n"
+        "   -o, --output=[OUTPUT]     save results into the OUTPUT json file\n"
+        "   -c, --compare=[RESULTS]   compare with previous RESULTS json file (exit code 1 on regression)\n"
+        "   -r, --repeat=[REPEAT]     number of runs of each document, the best one is kept (default 3)\n"
+        "   -s, --scale=[PAGES]       also parse a document of at least PAGES pages made of the samples (needs pdfunite)\n"
+        "   --threshold=[PERCENT]     slowdown (in percents) reported as a regression (default 20)\n"
+        "   --no-micro                skip microbenchmarks\n"
+        "   -h, --help                show helper for this script\n")
+STAGES = ['rasterize', 'words', 'contours', 'weeks', 'hours', 'courses', 'ics', 'other']
+"""Stages of the pipeline, 'contours' also includes page images and 'other' what isn't in a stage (pdf copy, digest...)
+"""
+MIN_TIME = 0.001
+"""Time (in seconds) under which a slowdown isn't reported (too noisy)
+"""
+
+
+class StageProfiler:
+    """Measure the time and peak memory of each stage of the pipeline
+
+    Stages are functions wrapped with a timer, the time of a stage excludes the time of the stages it calls,
+    its peak memory is the highest resident memory sampled while it runs
+    """
+    
+    def __init__(self, interval: float = 0.005) -> None:
+        """Constructor of StageProfiler
+
+        Args:
+            interval (float, optional): delay (in seconds) between two memory samples. Defaults to 0.005.
+        """
+        self.interval = interval
+        self.times: Dict[str, float] = {}
+        self.peaks: Dict[str, int] = {}
+        self.__stack: List[list] = []
+        self.__patched: List[tuple] = []
+        self.__lock = threading.Lock()
+        self.__running = False
+        self.__sampler: threading.Thread = None
+    
+    def wrap(self, owner: Any, attribute: str, stage: str) -> None:
+        """Measure a function as a stage
+
+        Args:
+            owner (Any): class or module of the function
+            attribute (str): name of the function
+            stage (str): name of the stage
+        """
+        original = owner.__dict__[attribute]
+        function = original.__func__ if isinstance(original, (classmethod, staticmethod)) else original
+        profiler = self
+
+        def measured(*args, **kwargs):
+            profiler.__enter(stage)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.__exit()
+        if isinstance(original, classmethod):
+            measured = classmethod(measured)
+        elif isinstance(original, staticmethod):
+            measured = staticmethod(measured)
+        setattr(owner, attribute, measured)
+        self.__patched.append((owner, attribute, original))
+    
+    def wrap_generator(self, owner: Any, attribute: str, stage: str) -> None:
+        """Measure a generator as a stage (only the time spent getting each item)
+
+        Args:
+            owner (Any): class or module of the generator function
+            attribute (str): name of the generator function
+            stage (str): name of the stage
+        """
+        original = owner.__dict__[attribute]
+        profiler = self
+
+        def measured(*args, **kwargs):
+            items = original(*args, **kwargs)
+            while True:
+                profiler.__enter(stage)
+                try:
+                    item = next(items, None)
+                finally:
+                    profiler.__exit()
+                if item is None:
+                    return
+                yield item
+        setattr(owner, attribute, measured)
+        self.__patched.append((owner, attribute, original))
+    
+    def reset(self) -> None:
+        """Forget measures
+        """
+        self.times = {s: 0.0 for s in STAGES}
+        self.peaks = {s: 0 for s in STAGES}
+    
+    def start(self) -> None:
+        """Start sampling memory
+        """
+        self.__running = True
+        self.__sampler = threading.Thread(target=self.__sample, daemon=True)
+        self.__sampler.start()
+    
+    def stop(self) -> None:
+        """Stop sampling memory and restore wrapped functions
+        """
+        self.__running = False
+        self.__sampler.join()
+        for owner, attribute, original in reversed(self.__patched):
+            setattr(owner, attribute, original)
+        self.__patched = []
+    
+    def __enter(self, stage: str) -> None:
+        """Start a stage
+
+        Args:
+            stage (str): name of the stage
+        """
+        with self.__lock:
+            self.__stack.append([stage, time.perf_counter(), 0.0])
+        self.__record(rss())
+    
+    def __exit(self) -> None:
+        """End the current stage
+        """
+        self.__record(rss())
+        with self.__lock:
+            stage, start, children = self.__stack.pop()
+            elapsed = time.perf_counter() - start
+            self.times[stage] += elapsed - children
+            if len(self.__stack):
+                self.__stack[-1][2] += elapsed
+    
+    def __record(self, memory: int) -> None:
+        """Record a memory sample for each running stage
+
+        Args:
+            memory (int): resident memory in bytes
+        """
+        with self.__lock:
+            for stage, _, _ in self.__stack:
+                self.peaks[stage] = max(self.peaks[stage], memory)
+    
+    def __sample(self) -> None:
+        """Sample memory until stopped (sampler thread)
+        """
+        while self.__running:
+            self.__record(rss())
+            time.sleep(self.interval)
+
+
+def gen_profiler() -> StageProfiler:
+    """Wrap each stage of the pipeline
+
+    Returns:
+        StageProfiler: profiler of the stages (to stop once done)
+    """
+    profiler = StageProfiler()
+    profiler.wrap_generator(parser, 'render_pages', 'rasterize')
+    profiler.wrap(Pdf, 'fetch_words', 'words')
+    profiler.wrap(Pdf, 'gen_page', 'contours')
+    profiler.wrap(Page, 'gen_weeks', 'weeks')
+    profiler.wrap(Hours, '__init__', 'hours')
+    profiler.wrap(Week, 'gen_courses', 'courses')
+    profiler.wrap(parser, 'gen_calendars', 'ics')
+    profiler.reset()
+    return profiler
+
+def count_pages(path: str) -> int:
+    """Get the number of pages of a pdf
+
+    Args:
+        path (str): pdf path
+
+    Returns:
+        int: number of pages
+    """
+    with open(path, 'rb') as file:
+        return sum(1 for _ in PDFPage.get_pages(fp=file))
+
+def bench_document(profiler: StageProfiler, path: str, workdir: str, repeat: int) -> dict:
+    """Parse a pdf with the whole pipeline (offline, sequentially and without cache)
+
+    Args:
+        profiler (StageProfiler): profiler of the stages
+        path (str): pdf path (used as url)
+        workdir (str): working directory
+        repeat (int): number of runs, the best one is kept
+
+    Returns:
+        dict: pages, courses, total time and time and peak memory of each stage
+    """
+    level = os.path.splitext(os.path.basename(path))[0]
+    best = None
+    for _ in range(repeat):
+        shutil.rmtree(workdir, ignore_errors=True)
+        ics_dir = f'{workdir}/ics'
+        os.makedirs(ics_dir)
+        parser.SCHEDULES = {level: {'url': path}}
+        profiler.reset()
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            parser.parsing_edt(level, path, workdir, ics_dir)
+        total = time.perf_counter() - start
+        if best is None or total < best['total']:
+            with open(f'{ics_dir}/{level}.ics', 'rb') as file:
+                courses = file.read().count(b'BEGIN:VEVENT')
+            profiler.times['other'] = total - sum(profiler.times.values())
+            profiler.peaks['other'] = max(profiler.peaks.values())
+            stages = {s: {'time': profiler.times[s], 'peak_rss': profiler.peaks[s]} for s in STAGES}
+            best = {'pages': count_pages(path), 'courses': courses, 'total': total, 'stages': stages}
+    return best
+
+def gen_scaled(pages: int, directory: str) -> str:
+    """Concatenate the samples into a single document
+
+    Args:
+        pages (int): minimum number of pages
+        directory (str): directory of the document
+
+    Returns:
+        str: path of the document
+    """
+    samples = sorted(f'{SCHEDULES_DIR}/{f}' for f in os.listdir(SCHEDULES_DIR) if f.endswith('.pdf'))
+    sizes = {s: count_pages(s) for s in samples}
+    parts = []
+    while sum(sizes[p] for p in parts) < pages:
+        parts.append(samples[len(parts) % len(samples)])
+    path = f'{directory}/SCALE_{pages}.pdf'
+    subprocess.run(['pdfunite', *parts, path], check=True)
+    return path
+
+def bench_micro() -> Dict[str, dict]:
+    """Benchmark the hot primitives on the first page of the first sample
+    
+    Queries of the words index (bounding the center of each word, contained by each day column) are compared with a linear scan of the words
+
+    Returns:
+        Dict[str, dict]: best time of a call and number of calls by primitive
+    """
+    sample = sorted(f for f in os.listdir(SCHEDULES_DIR) if f.endswith('.pdf'))[0]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf = Pdf(f'{SCHEDULES_DIR}/{sample}', temp_dir)
+        for page_number, rendered in pdf.iter_render(pages=[0]):
+            words = pdf.fetch_words([page_number], {page_number: Area(p1=Point(0,0), p2=Point(*rendered.size))})[page_number]
+            page = pdf.gen_page(page_number, rendered, words)
+    words = page.words.copy()
+    contour = page.week_coordinate[0]
+    weeks = [w for w in page.gen_weeks() if len(w.classes) and len(w.hours.time_axe)]
+    week = max(weeks, key=lambda w: len(w.classes))
+    axe = week.hours.time_axe
+    xs = list(range(0, week.image.area.x2(), 7))
+    frames = week.frames.copy()
+    index = words.index()
+    centers = [w.center() for w in words]
+    columns = [d for c in page.week_coordinate for d in c.slice(6, AxeType.ABSCISSA)] # a column by day of each week
+    assert [index.bounding(p) for p in centers] == [[i for i, w in enumerate(words) if w.in_bound(p)] for p in centers]
+    assert [index.contained(c) for c in columns] == [[i for i, w in enumerate(words) if c.contain(w)] for c in columns]
+    cases: Dict[str, Callable[[], Any]] = {
+        'Image.percent_color': lambda: [week.image.percent_color(Color.YELLOW, False, c) for c in week.classes],
+        'Image.percent_colors': lambda: week.image.percent_colors(week.classes, Color.YELLOW, False),
+        'AreaList.contained': lambda: words.contained(contour),
+        'AreaList.match': lambda: words.match(Time.REGEX_HOUR),
+        'Axe.closest': lambda: [axe.closest(x) for x in xs],
+        'Week.__get_classes': lambda: week._Week__get_classes(frames.copy()),
+        'AreaList.index': lambda: words.index(),
+        'AreaIndex.bounding': lambda: [index.bounding(p) for p in centers],
+        'AreaList.bounding (scan)': lambda: [[i for i, w in enumerate(words) if w.in_bound(p)] for p in centers],
+        'AreaIndex.contained': lambda: [index.contained(c) for c in columns],
+        'AreaList.contained (scan)': lambda: [[i for i, w in enumerate(words) if c.contain(w)] for c in columns],
+    }
+    calls = {'Image.percent_color': len(week.classes), 'Axe.closest': len(xs),
+             'AreaIndex.bounding': len(centers), 'AreaList.bounding (scan)': len(centers),
+             'AreaIndex.contained': len(columns), 'AreaList.contained (scan)': len(columns)}
+    results = {}
+    for name, case in cases.items():
+        timer = timeit.Timer(case)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        results[name] = {'time': best / calls.get(name, 1), 'calls': calls.get(name, 1)}
+    return results
+
+def compare(current: dict, previous: dict, threshold: float) -> List[str]:
+    """Find the measures slower than a previous run
+
+    Args:
+        current (dict): results of this run
+        previous (dict): results of the previous run
+        threshold (float): slowdown (ratio) reported as a regression
+
+    Returns:
+        List[str]: description of each regression
+    """
+    pairs = []
+    for name, document in current['documents'].items():
+        if name in previous.get('documents', {}):
+            old = previous['documents'][name]
+            pairs.append((f'{name} total', document['total'], old['total']))
+            pairs += [(f'{name} {s}', document['stages'][s]['time'], old['stages'][s]['time']) for s in STAGES if s in old['stages']]
+    pairs = [p for p in pairs if p[1] >= MIN_TIME]
+    for name, micro in current.get('micro', {}).items(): # repeated until stable, no minimum time
+        if name in previous.get('micro', {}):
+            pairs.append((name, micro['time'], previous['micro'][name]['time']))
+    return [f'{name} : {old:.6f}s -> {new:.6f}s (+{(new / old - 1) * 100:.0f}%)' for name, new, old in pairs if new > old * (1 + threshold)]
+
+def print_results(results: dict) -> None:
+    """Print results as tables
+
+    Args:
+        results (dict): results of this run
+    """
+    print(f"{'document':<24}{'pages':>6}{'courses':>8}{'total':>9}" + ''.join(f'{s:>11}' for s in STAGES))
+    for name, d in results['documents'].items():
+        print(f"{name:<24}{d['pages']:>6}{d['courses']:>8}{d['total']:>8.2f}s" + ''.join(f"{d['stages'][s]['time']:>10.3f}s" for s in STAGES))
+        print(f"{'  peak rss (MB)':<47}" + ''.join(f"{d['stages'][s]['peak_rss'] / 2**20:>11.0f}" for s in STAGES))
+    for name, m in results.get('micro', {}).items():
+        print(f"{name:<28}{m['time'] * 1e6:>8.2f}us")
+
+def main(argv: list) -> None:
+    """Run the benchmarks
+
+    Args:
+        argv (list): list of argument and values pass by the user
+    """
+    options, _ = getopt.getopt(argv, 'o:c:r:s:h', ['output=', 'compare=', 'repeat=', 'scale=', 'threshold=', 'no-micro', 'help'])
+    options = dict(options)
+    if '-h' in options or '--help' in options:
+        print(HELP)
+        return
+    output = options.get('-o', options.get('--output'))
+    previous = options.get('-c', options.get('--compare'))
+    repeat = int(options.get('-r', options.get('--repeat', 3)))
+    scale = options.get('-s', options.get('--scale'))
+    threshold = float(options.get('--threshold', 20)) / 100
+    with tempfile.TemporaryDirectory() as temp_dir:
+        parser.GENERAL = {'workdir': temp_dir, 'output': f'{temp_dir}/ics', 'force': True, 'page_workers': 0, 'cache_size': 0}
+        parser.FTP = []
+        parser.PAGE_POOL = parser.PAGE_CACHE = parser.FTP_PUBLISHER = None
+        documents = sorted(f'{SCHEDULES_DIR}/{f}' for f in os.listdir(SCHEDULES_DIR) if f.endswith('.pdf'))
+        if scale is not None:
+            documents.append(gen_scaled(int(scale), temp_dir))
+        results = {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'version': parser.VERSION,
+                   'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(), 'documents': {}}
+        profiler = gen_profiler()
+        profiler.start()
+        try:
+            for path in documents:
+                name = os.path.splitext(os.path.basename(path))[0]
+                results['documents'][name] = bench_document(profiler, path, f'{temp_dir}/{name}', repeat)
+        finally:
+            profiler.stop()
+        if '--no-micro' not in options:
+            results['micro'] = bench_micro()
+    print_results(results)
+    if output is not None:
+        with open(output, 'w') as file:
+            json.dump(results, file, indent=4)
+    if previous is not None:
+        with open(previous) as file:
+            regressions = compare(results, json.load(file), threshold)
+        for r in regressions:
+            print(f'Regression {r}')
+        if len(regressions):
+            exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,129 @@
+import importlib.util
+import os
+import random
+import shutil
+import sys
+from typing import List
+
+import pytest
+
+SCHEDULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schedules')
+SRC_DIR = os.path.join(os.path.dirname(SCHEDULES_DIR), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from files import Pdf
+from geometry import Area, AreaList, Point
+from schedule import Week
+from utils import MemoryBudget
+from utils.metrics import Metrics
+
+# src/parser.py is loaded by path, 'import parser' would get the standard library module on python 3.8 and 3.9
+_SPEC = importlib.util.spec_from_file_location('metronome_parser', os.path.join(SRC_DIR, 'parser.py'))
+parser = importlib.util.module_from_spec(_SPEC)
+sys.modules[_SPEC.name] = parser
+_SPEC.loader.exec_module(parser)
+
+SAMPLES = sorted(f for f in os.listdir(SCHEDULES_DIR) if f.endswith('.pdf'))
+"""Sample schedules
+"""
+
+
+def reference_detect_multiple_weeks(self: Week, words_days: AreaList) -> bool:
+    """Brute force Week.__detect_multiple_weeks (compare each pair of days)
+    """
+    duplicate = False
+    for wd1 in words_days:
+        for wd2 in words_days:
+            if wd1 != wd2 and wd1.content == wd2.content:
+                duplicate = True
+    return duplicate
+
+def reference_resize_words(self: Week, frames: AreaList, words_days: AreaList, words_id: AreaList) -> None:
+    """Brute force Week.__resize_words (scan every frame for each word)
+    """
+    for day in words_days:
+        for frame in frames:
+            if frame.in_bound(day.center()) and day.h() < frame.h():
+                day.resize(frame)
+    for id in words_id:
+        for frame in frames:
+            if frame.in_bound(id.center()) and id.w() < frame.w():
+                id.resize(frame)
+
+def reference_remove_overlapping(self: Week, classes: AreaList) -> None:
+    """Brute force Week.__remove_overlapping (compare each pair of frames, a frame contained by several ones is removed once)
+    """
+    overlapping = []
+    for c1 in classes:
+        for c2 in classes:
+            if c1 != c2 and c1.contain(c2):
+                overlapping.append(c2)
+    for o in overlapping:
+        if o in classes:
+            classes.remove(o)
+
+def reference_get_classes(self: Week, frames: AreaList) -> AreaList:
+    """Brute force Week.__get_classes (scan every word for each frame)
+    """
+    classes = AreaList()
+    reference_remove_overlapping(self, frames)
+    self.words.sort(key=lambda a: a.p1.y)
+    for frame in frames:
+        frame.content = [word.content for word in self.words if frame.in_bound(word.center())]
+        if len(frame.content) != 0:
+            classes.append(frame)
+    return classes
+
+def parse_courses(path: str, workdir: str) -> List[tuple]:
+    """Parse a pdf with the whole pipeline (offline, sequentially and without cache)
+
+    Args:
+        path (str): pdf path
+        workdir (str): working directory
+
+    Returns:
+        List[tuple]: begin, end, name, location, teacher, group and exam of each course
+    """
+    level = os.path.splitext(os.path.basename(path))[0]
+    pdf = Pdf(path, workdir)
+    courses = parser.parsing_pdf(level, workdir, pdf, MemoryBudget(), Metrics(level))
+    return sorted((c.begin, c.end, c.name, c.location, c.teacher, str(c.group), c.exam) for c in courses)
+
+
+@pytest.fixture
+def offline(tmp_path):
+    """Parse without page pool, page cache nor ftp
+    """
+    parser.GENERAL = {'workdir': str(tmp_path), 'output': f'{tmp_path}/ics', 'force': True, 'page_workers': 0, 'cache_size': 0}
+    parser.FTP = []
+    parser.PAGE_POOL = parser.PAGE_CACHE = parser.FTP_PUBLISHER = None
+    return tmp_path
+
+@pytest.mark.skipif(shutil.which('pdftoppm') is None, reason='poppler is needed to render the samples')
+@pytest.mark.parametrize('sample', SAMPLES)
+def test_sample_courses(sample, offline, monkeypatch):
+    """Courses of each sample are the same with the brute force frames and words lookups
+    """
+    courses = parse_courses(f'{SCHEDULES_DIR}/{sample}', str(offline / 'indexed'))
+    monkeypatch.setattr(Week, '_Week__detect_multiple_weeks', reference_detect_multiple_weeks)
+    monkeypatch.setattr(Week, '_Week__resize_words', reference_resize_words)
+    monkeypatch.setattr(Week, '_Week__get_classes', reference_get_classes)
+    reference = parse_courses(f'{SCHEDULES_DIR}/{sample}', str(offline / 'reference'))
+    assert len(courses)
+    assert courses == reference
+
+@pytest.mark.parametrize('seed', range(20))
+def test_remove_overlapping(seed):
+    """Nested, duplicated and overlapping frames are removed as with a comparison of each pair
+    """
+    rand = random.Random(seed)
+    frames = AreaList()
+    for _ in range(rand.randint(1, 200)):
+        x, y = rand.randrange(0, 2000, 5), rand.randrange(0, 2000, 5)
+        frames.append(Area(p1=Point(x, y), p2=Point(x + rand.randrange(5, 300, 5), y + rand.randrange(5, 300, 5))))
+        if rand.random() < 0.2: # same frame found twice
+            frames.append(frames.last().copy())
+    reference = frames.copy()
+    reference_remove_overlapping(None, reference)
+    Week._Week__remove_overlapping(object.__new__(Week), frames)
+    assert [(f.p1.tuple(), f.p2.tuple()) for f in frames] == [(f.p1.tuple(), f.p2.tuple()) for f in reference]